@@ -1,88 +1,225 @@
+import time
+# Read before anything else is imported, so the first-paint report covers the imports
+STARTED = time.perf_counter()
+
+import argparse
+import os
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import hashlib
-import random
-
-class ZKPVerification:
-    def __init__(self):
-        self.p = int('FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F14374FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7EDEE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF0598DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3BBE39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF6955817183995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF', 16)
-        self.g = 2
+from zkp_protocol import ZKPProtocol
+from applicant_index import ApplicantIndex, load_or_build_index
+from virtual_tree import ListSource, VirtualTreeview
+from gui_tasks import RUNNING, QUEUED, WARMUP_DELAY_MS, TaskScheduler, after_first_paint, report_first_paint
+import metrics
+from amounts import parse_amount
+# pandas and numpy (ingest, allotment, listing_search, market_stats) are imported where first
+# used: they are most of the startup time, and nothing on screen needs them before the data loads
 
-    def create_proof(self, secret_data):
-        x = int.from_bytes(hashlib.sha256(secret_data.encode()).digest(), 'big')
-        r = random.randrange(self.p)
-        commitment = pow(self.g, r, self.p)
-        challenge = random.randrange(2**128)
-        return {'commitment': commitment, 'challenge': challenge, 'response': (r + challenge * x) % (self.p - 1)}
+LISTING_TABS = ("Mainboard IPO", "SME IPO")
 
-    def verify_proof(self, public_data, proof):
-        x = int.from_bytes(hashlib.sha256(public_data.encode()).digest(), 'big')
-        return pow(self.g, proof['response'], self.p) == (proof['commitment'] * pow(pow(self.g, x, self.p), proof['challenge'], self.p)) % self.p
+class ZKPVerification(ZKPProtocol):
+    """ZKPProtocol under the GUI's names: create_proof is generate_proof"""
+    create_proof = ZKPProtocol.generate_proof
 
 class UnifiedIPOSystem(tk.Tk):
-    def __init__(self):
+    def __init__(self, lazy=True, seed=None):
         super().__init__()
         self.title("IPO Allotment Status System")
         self.geometry("1200x800")
-        self.zkp = ZKPVerification()
+        # Built by the warm-up: the fixed-base table takes about half a second
+        self.zkp = None
+        # ZKP math and CSV parsing run here, off the Tk thread; results come back via after()
+        self.tasks = TaskScheduler(self)
+        self.protocol("WM_DELETE_WINDOW", self.close)
         
-        try:
-            self.db = pd.read_csv('ipo_applications.csv')
-            self.db['ipo_alloted'] = [random.choice([True, False]) for _ in range(len(self.db))]
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Database not found!")
-            self.db = pd.DataFrame()
+        self.db = None
+        # Lottery seed; its commitment is shown in the Analysis tab so the draw can be audited
+        self.seed = seed
+        self.allotment = None
+        self.index = ApplicantIndex()
+        self.database_ready = False
+        self.database_task = None
+        # Set once listing_search and market_stats are imported
+        self.modules_ready = False
+        self.stats = None
+        # (lots, amount) of applications submitted from the forms; not in the database file
+        self.submitted = []
+        # Tab name -> ListingSearchIndex, built by import_modules
+        self.search_indexes = {}
+        self.stats_frame = None
+        self.status_label = None
+        # Tab name -> (search entry, listing) for built listing tabs, and their search controllers
+        self.search_widgets = {}
+        self.searches = {}
         
-        self.setup_gui()
         self.load_sample_data()
+        self.setup_gui()
+        if lazy:
+            # Show the window first; load once it has painted, or on the first status check
+            after_first_paint(self, lambda: self.after(WARMUP_DELAY_MS, self.warm_up))
+        else:
+            # Everything imported and every tab built before the window shows, as before
+            self.modules_loaded(self.import_modules())
+            for frame in list(self.unbuilt_tabs):
+                self.build_tab(frame)
+            self.warm_up()
+
+    def import_modules(self):
+        """Runs on a worker thread in lazy mode: everything that imports numpy or pandas"""
+        import ingest, allotment
+        self.ensure_zkp()
+        return self.build_listing_state()
+
+    def build_listing_state(self):
+        """Listing statistics and a search index per tab; the listings never change after startup"""
+        from listing_search import ListingSearchIndex
+        return self.build_statistics(), {tab_name: ListingSearchIndex(self.listings[tab_name]) for tab_name in LISTING_TABS}
+
+    def build_statistics(self, db=None, allotment=None):
+        from market_stats import MarketStatistics
+        stats = MarketStatistics()
+        stats.rebuild_listings([row for tab_name in LISTING_TABS for row in self.listings[tab_name]])
+        if db is not None:
+            stats.rebuild_applications(db, allotment)
+        return stats
+
+    def ensure_zkp(self):
+        if self.zkp is None:
+            self.zkp = ZKPVerification()
+        return self.zkp
+
+    def modules_loaded(self, loaded=None):
+        """Install what import_modules built; builds it here only if needed before the worker is done"""
+        if self.modules_ready:
+            return
+        self.stats, self.search_indexes = loaded or self.build_listing_state()
+        self.modules_ready = True
+        for tab_name in LISTING_TABS:
+            self.attach_search(tab_name)
+        self.refresh_statistics()
+
+    def warm_up(self):
+        """Import, build the ZKP tables and load the applications in the background; runs once"""
+        if self.database_task is not None:
+            return
+        if not self.modules_ready:
+            self.tasks.submit(self.import_modules, key='modules', on_done=self.modules_loaded)
+        self.database_task = self.tasks.submit(self.load_database, key='database',
+                                               on_done=self.database_loaded, on_error=self.database_failed)
+        if self.status_label is not None:
+            self.status_label.config(text="Loading applications...", foreground="gray")
+
+    def load_database(self):
+        from ingest import load_applications
+        from allotment import INPUT_COLUMNS, AllotmentEngine
+        # The allotment and the statistics use a handful of columns; the index is saved on disk
+        with metrics.timer('load_seconds', stage='applications'):
+            db = load_applications('ipo_applications.csv', columns=INPUT_COLUMNS)
+        with metrics.timer('load_seconds', stage='allotment'):
+            allotment = AllotmentEngine(lots_offered=len(db) // 2, seed=self.seed).allot(db)
+        db['ipo_alloted'] = allotment.alloted
+        with metrics.timer('load_seconds', stage='index'):
+            index = load_or_build_index(db, 'ipo_applications.csv')
+        return db, allotment, index, self.build_statistics(db, allotment)
+
+    def database_loaded(self, loaded):
+        self.db, self.allotment, self.index, stats = loaded
+        self.database_ready = True
+        self.modules_loaded()
+        # Replaces the listings-only statistics; the worker has already added the database's
+        # applications, but not the ones submitted here while it was loading
+        for lots, total in self.submitted:
+            stats.add_application(lots, amount=total)
+        self.stats = stats
+        self.refresh_statistics()
+        if self.status_label is not None:
+            self.status_label.config(text="")
+
+    def database_failed(self, error):
+        self.database_ready = True
+        if self.status_label is not None:
+            self.status_label.config(text="")
+        if isinstance(error, FileNotFoundError):
+            messagebox.showerror("Error", "Database not found!")
+        else:
+            messagebox.showerror("Error", f"Could not load the database: {error}")
+
+    def close(self):
+        self.tasks.shutdown()
+        self.destroy()
 
     def setup_gui(self):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Create IPO tabs
-        for tab_name in ["Mainboard IPO", "SME IPO"]:
+        # Tabs start empty and are filled in the first time they are selected
+        self.unbuilt_tabs = {}
+        builders = [(tab_name, lambda frame, tab=tab_name: self.setup_listing_tab(frame, tab)) for tab_name in LISTING_TABS]
+        builders += [("Check Status", self.setup_status_tab), ("Analysis", self.setup_analysis_tab)]
+        for tab_name, build in builders:
             frame = ttk.Frame(self.notebook)
             self.notebook.add(frame, text=tab_name)
-            
-            # Search frame
-            search_frame = ttk.Frame(frame)
-            search_frame.pack(fill='x', padx=5, pady=5)
-            ttk.Entry(search_frame).pack(side='left', expand=True, fill='x', padx=5)
-            
-            # Table frame
-            table_frame = ttk.Frame(frame)
-            table_frame.pack(fill='both', expand=True, padx=5, pady=5)
-            
-            columns = ('Company Name', 'Issue Open', 'Issue Close', 'Price Band (₹)', 'Lot Size', 'Issue Size (Cr)', 'Status')
-            tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=10)
-            for col in columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=150)
-            
-            tree.pack(side='left', fill='both', expand=True)
-            scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=tree.yview)
-            scrollbar.pack(side='right', fill='y')
-            tree.configure(yscrollcommand=scrollbar.set)
-            
-            # Application form frame (initially hidden)
-            form_frame = ttk.LabelFrame(frame, text="Application Form", padding="10")
-            form_frame.pack(fill='x', padx=5, pady=5)
-            form_frame.pack_forget()  # Initially hidden
-            
-            # Store frames and trees as attributes
-            setattr(self, f"{tab_name.lower().replace(' ', '_')}_tree", tree)
-            setattr(self, f"{tab_name.lower().replace(' ', '_')}_form", form_frame)
-            
-            # Bind click event for both tabs
-            tree.bind('<<TreeviewSelect>>', 
-                     lambda e, tab=tab_name: self.show_application_form(e, tab))
+            self.unbuilt_tabs[str(frame)] = (frame, build)
+        self.notebook.bind('<<NotebookTabChanged>>', lambda e: self.build_tab(self.notebook.select()))
+        self.build_tab(self.notebook.select())
 
-        # Status check tab
-        status_frame = ttk.Frame(self.notebook)
-        self.notebook.add(status_frame, text="Check Status")
+    def build_tab(self, frame_name):
+        pending = self.unbuilt_tabs.pop(frame_name, None)
+        if pending is not None:
+            frame, build = pending
+            build(frame)
+
+    def setup_listing_tab(self, frame, tab_name):
+        prefix = tab_name.lower().replace(' ', '_')
+        
+        # Search frame
+        search_frame = ttk.Frame(frame)
+        search_frame.pack(fill='x', padx=5, pady=5)
+        search_entry = ttk.Entry(search_frame)
+        search_entry.pack(side='left', expand=True, fill='x', padx=5)
+        
+        # Table frame
+        table_frame = ttk.Frame(frame)
+        table_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        columns = ('Company Name', 'Issue Open', 'Issue Close', 'Price Band (₹)', 'Lot Size', 'Issue Size (Cr)', 'Status')
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=10)
+        for col in columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=150)
+        
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar = ttk.Scrollbar(table_frame, orient='vertical')
+        scrollbar.pack(side='right', fill='y')
+        
+        # Application form frame (initially hidden)
+        form_frame = ttk.LabelFrame(frame, text="Application Form", padding="10")
+        form_frame.pack(fill='x', padx=5, pady=5)
+        form_frame.pack_forget()  # Initially hidden
+        
+        # Only a screenful of rows lives in the tree; the listing pages them in as it scrolls
+        listing = VirtualTreeview(tree, scrollbar,
+                                  on_select=lambda e, tab=tab_name: self.show_application_form(e, tab))
+        listing.set_source(ListSource(self.listings[tab_name]))
         
+        # Store frames, trees and listings as attributes
+        setattr(self, f"{prefix}_tree", tree)
+        setattr(self, f"{prefix}_form", form_frame)
+        setattr(self, f"{prefix}_listing", listing)
+        self.search_widgets[tab_name] = (search_entry, listing)
+        self.attach_search(tab_name)
+
+    def attach_search(self, tab_name):
+        """Filter the tab's listing as the user types, once it is built and listing_search is imported"""
+        if not self.modules_ready or tab_name not in self.search_widgets or tab_name in self.searches:
+            return
+        from listing_search import SearchController
+        search = SearchController(*self.search_widgets[tab_name])
+        # Applies anything typed while the module was loading
+        search.set_rows(self.listings[tab_name], self.search_indexes[tab_name])
+        self.searches[tab_name] = search
+
+    def setup_status_tab(self, status_frame):
         content_frame = ttk.Frame(status_frame)
         content_frame.place(relx=0.5, rely=0.5, anchor='center')
         
@@ -99,27 +236,32 @@ class UnifiedIPOSystem(tk.Tk):
         ttk.Button(content_frame, text="Check Status", command=self.verify_status).pack(pady=20)
         self.status_label = ttk.Label(content_frame, text="", font=('Helvetica', 12))
         self.status_label.pack(pady=10)
+        if self.database_task is not None and not self.database_ready:
+            self.status_label.config(text="Loading applications...", foreground="gray")
 
-        # Analysis tab
-        self.setup_analysis_tab()
+    def setup_analysis_tab(self, analysis_frame):
+        self.stats_frame = ttk.LabelFrame(analysis_frame, text="Market Statistics")
+        self.stats_frame.pack(fill='x', padx=5, pady=5)
+        self.refresh_statistics()
+        # Opened before the warm-up started: start it now rather than wait
+        self.warm_up()
 
-    def setup_analysis_tab(self):
-        analysis_frame = ttk.Frame(self.notebook)
-        self.notebook.add(analysis_frame, text="Analysis")
-        
-        stats_frame = ttk.LabelFrame(analysis_frame, text="Market Statistics")
-        stats_frame.pack(fill='x', padx=5, pady=5)
-        
-        stats = [
-            ("Total Active IPOs:", "15"),
-            ("Average Issue Size:", "₹4,500 Cr"),
-            ("Success Rate:", "75%"),
-            ("Average Subscription:", "12.5x")
-        ]
-        
-        for i, (label, value) in enumerate(stats):
-            ttk.Label(stats_frame, text=label).grid(row=i, column=0, padx=5, pady=2, sticky='e')
-            ttk.Label(stats_frame, text=value).grid(row=i, column=1, padx=5, pady=2, sticky='w')
+    @metrics.timed('widget_update_seconds', "Time redrawing widgets on the Tk thread", widget='statistics')
+    def refresh_statistics(self):
+        # The aggregates are kept current as data changes; this only redraws them
+        if self.stats_frame is None:
+            return
+        for widget in self.stats_frame.winfo_children():
+            widget.destroy()
+        if self.stats is None:
+            ttk.Label(self.stats_frame, text="Loading...").grid(row=0, column=0, padx=5, pady=2)
+            return
+        rows = self.stats.summary_rows()
+        if self.allotment is not None:
+            rows = rows + [("Allotment Seed Commitment:", self.allotment.commitment)]
+        for i, (label, value) in enumerate(rows):
+            ttk.Label(self.stats_frame, text=label).grid(row=i, column=0, padx=5, pady=2, sticky='e')
+            ttk.Label(self.stats_frame, text=value).grid(row=i, column=1, padx=5, pady=2, sticky='w')
 
     def show_application_form(self, event, tab_name):
         tree = getattr(self, f"{tab_name.lower().replace(' ', '_')}_tree")
@@ -169,14 +311,26 @@ class UnifiedIPOSystem(tk.Tk):
         amount_label = ttk.Label(amount_frame, text="Total Amount: ₹0.00")
         amount_label.pack(side='left', padx=5)
         
+        def application_total(lots):
+            # Upper end of the price band; SME listings have a single price
+            return int(lots) * min_lot_size * parse_amount(price_band)
+        
+        def invalid_lots(error):
+            messagebox.showerror("Error", "Please enter a valid number of lots")
+        
+        def show_amount(total):
+            # The form may have been replaced by another company's while this ran
+            if amount_label.winfo_exists():
+                amount_label.config(text=f"Total Amount: ₹{total:,.2f}")
+        
         def calculate_amount():
+            # One multiplication: done here rather than queued behind the warm-up
             try:
-                lots = int(lot_spinbox.get())
-                price = float(price_band.split('-')[1].replace('₹', '').replace(',', ''))
-                total = lots * min_lot_size * price
-                amount_label.config(text=f"Total Amount: ₹{total:,.2f}")
-            except ValueError:
-                messagebox.showerror("Error", "Please enter a valid number of lots")
+                total = application_total(lot_spinbox.get())
+            except ValueError as e:
+                invalid_lots(e)
+                return
+            show_amount(total)
         
         # Button frame
         button_frame = ttk.Frame(content_frame)
@@ -184,19 +338,33 @@ class UnifiedIPOSystem(tk.Tk):
         
         ttk.Button(button_frame, text="Calculate Amount", command=calculate_amount).pack(side='left', padx=5)
         
+        def application_submitted(lots, total, loaded=None):
+            self.modules_loaded(loaded)
+            self.submitted.append((lots, total))
+            self.stats.add_application(lots, amount=total)
+            self.refresh_statistics()
+            messagebox.showinfo("Success", 
+                f"Application submitted successfully!\n\n"
+                f"Company: {company_name}\n"
+                f"Lots: {lots}\n"
+                f"Shares: {lots * min_lot_size}\n"
+                f"Total Amount: ₹{total:,.2f}"
+            )
+        
         def submit_application():
+            lots = lot_spinbox.get()
             try:
-                lots = int(lot_spinbox.get())
-                total = lots * min_lot_size * float(price_band.split('-')[1].replace('₹', '').replace(',', ''))
-                messagebox.showinfo("Success", 
-                    f"Application submitted successfully!\n\n"
-                    f"Company: {company_name}\n"
-                    f"Lots: {lots}\n"
-                    f"Shares: {lots * min_lot_size}\n"
-                    f"Total Amount: ₹{total:,.2f}"
-                )
-            except ValueError:
-                messagebox.showerror("Error", "Please enter a valid number of lots")
+                total = application_total(lots)
+            except ValueError as e:
+                invalid_lots(e)
+                return
+            lots = int(lots)
+            if self.modules_ready:
+                application_submitted(lots, total)
+            else:
+                # The statistics come with the deferred imports: join them, then record the application
+                self.tasks.submit(self.import_modules, key='modules',
+                                  on_done=lambda loaded: application_submitted(lots, total, loaded))
         
         ttk.Button(button_frame, text="Submit Application", command=submit_application).pack(side='left', padx=5)
 
@@ -209,21 +377,47 @@ class UnifiedIPOSystem(tk.Tk):
             self.status_label.config(text="Please enter both PAN and Aadhar numbers", foreground="red")
             return
         
-        try:
-            if self.zkp.verify_proof(pan, self.zkp.create_proof(pan)) and self.zkp.verify_proof(aadhar, self.zkp.create_proof(aadhar)):
-                user = self.db[self.db['pan_number'] == pan]
-                if len(user) > 0:
-                    is_alloted = user.iloc[0]['ipo_alloted']
-                    self.status_label.config(
-                        text=f"Congratulations! Your IPO application is {'ALLOTED' if is_alloted else 'NOT ALLOTED'}", 
-                        foreground="green" if is_alloted else "red"
-                    )
-                else:
-                    self.status_label.config(text="No application found with given details", foreground="red")
-            else:
-                self.status_label.config(text="Verification failed. Please check your details.", foreground="red")
-        except Exception:
-            self.status_label.config(text="An error occurred. Please try again.", foreground="red")
+        if not self.database_ready:
+            # First check before the warm-up finished, or started: run it once the data is in
+            self.warm_up()
+            self.database_task.add_callbacks(on_done=lambda loaded: self.verify_status())
+            self.status_label.config(text="Loading applications...", foreground="gray")
+            return
+        
+        # Repeated clicks for the same applicant join the check already running
+        self.tasks.submit(self.check_status, pan, aadhar, key=('status', pan, aadhar),
+                          on_done=self.show_status, on_error=self.status_failed, on_state=self.status_progress)
+
+    def check_status(self, pan, aadhar):
+        """Runs on a worker thread: (verified, alloted), alloted being None when there is no application"""
+        zkp = self.ensure_zkp()
+        if not (zkp.verify_proof(pan, zkp.create_proof(pan)) and zkp.verify_proof(aadhar, zkp.create_proof(aadhar))):
+            return False, None
+        with metrics.timer('lookup_seconds', key='pan'):
+            row = self.index.lookup_pan(pan)
+            alloted = None if row is None else bool(self.db['ipo_alloted'].iat[row])
+        metrics.count('lookups', result='miss' if row is None else 'hit')
+        return True, alloted
+
+    def status_progress(self, state):
+        if state in (QUEUED, RUNNING):
+            self.status_label.config(text="Verifying your details...", foreground="gray")
+
+    @metrics.timed('widget_update_seconds', widget='status')
+    def show_status(self, result):
+        verified, is_alloted = result
+        if not verified:
+            self.status_label.config(text="Verification failed. Please check your details.", foreground="red")
+        elif is_alloted is None:
+            self.status_label.config(text="No application found with given details", foreground="red")
+        else:
+            self.status_label.config(
+                text=f"Congratulations! Your IPO application is {'ALLOTED' if is_alloted else 'NOT ALLOTED'}", 
+                foreground="green" if is_alloted else "red"
+            )
+
+    def status_failed(self, error):
+        self.status_label.config(text="An error occurred. Please try again.", foreground="red")
 
     def load_sample_data(self):
         mainboard_data = [
@@ -257,18 +451,18 @@ class UnifiedIPOSystem(tk.Tk):
             ("Renewable Energy Corp", "Oct 22, 2024", "Oct 24, 2024", "₹205.00", "600", "₹125.00", "Closed")
         ]
         
-        # Clear and load Mainboard IPO data
-        for item in self.mainboard_ipo_tree.get_children():
-            self.mainboard_ipo_tree.delete(item)
-        for item in mainboard_data:
-            self.mainboard_ipo_tree.insert('', 'end', values=item)
-            
-        # Clear and load SME IPO data
-        for item in self.sme_ipo_tree.get_children():
-            self.sme_ipo_tree.delete(item)
-        for item in sme_data:
-            self.sme_ipo_tree.insert('', 'end', values=item)
+        # Shown as tabs are built; indexed for search and statistics once the modules are in
+        self.listings = {"Mainboard IPO": mainboard_data, "SME IPO": sme_data}
 
 if __name__ == "__main__":
-    app = UnifiedIPOSystem()
+    parser = argparse.ArgumentParser(description="IPO allotment status system")
+    parser.add_argument('--eager', action='store_true', help="build every tab and import everything before showing the window")
+    parser.add_argument('--seed', type=int, default=os.environ.get('IPO_ALLOTMENT_SEED'),
+                        help="allotment lottery seed (default: $IPO_ALLOTMENT_SEED, else random)")
+    parser.add_argument('--exit-after-paint', action='store_true', help="close once the first paint is reported (see benchmarks/startup.py)")
+    args = parser.parse_args()
+    metrics.configure_from_env()
+    app = UnifiedIPOSystem(lazy=not args.eager, seed=args.seed)
+    metrics.register_collector(lambda: {f'identity_cache_{k}': v for k, v in app.zkp.identity_cache.stats().items()} if app.zkp else {})
+    report_first_paint(app, STARTED, app.close if args.exit_after_paint else None)
     app.mainloop()
\ No newline at end of file
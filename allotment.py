@@ -0,0 +1,241 @@
+import hashlib
+import secrets
+from typing import Any, Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+RETAIL = 'Retail'
+HNI = 'HNI'
+
+# Share of the offered lots reserved for each investor category: SEBI's 35% retail / 15% NII
+# split, renormalised because QIB bids are not part of this database
+DEFAULT_CATEGORY_SHARES = {RETAIL: 0.7, HNI: 0.3}
+
+# Applications above this amount (in ₹) are HNI rather than retail
+RETAIL_LIMIT = 200_000
+
+# Within a category, lots are split between residents and NRIs, and between risk profiles, in
+# proportion to each bucket's demand
+DEFAULT_BUCKET_BY = ('residential_status', 'risk_category')
+
+# Application columns allot() reads when present (with the default buckets); loading only
+# these keeps the identifier text columns out of memory
+INPUT_COLUMNS = ('category', 'lots_applied') + DEFAULT_BUCKET_BY
+
+
+def seed_bytes(seed: Union[int, bytes, str]) -> bytes:
+    """Canonical byte form of a lottery seed"""
+    if isinstance(seed, bytes):
+        return seed
+    if isinstance(seed, int):
+        return seed.to_bytes(max(1, (seed.bit_length() + 7) // 8), 'big')
+    return seed.encode()
+
+
+def commit_seed(seed: Union[int, bytes, str]) -> str:
+    """Commitment to publish before the draw; revealing the seed later lets anyone re-run it"""
+    return hashlib.sha256(b'ipo-allotment-seed:' + seed_bytes(seed)).hexdigest()
+
+
+def verify_seed(seed: Union[int, bytes, str], commitment: str) -> bool:
+    return secrets.compare_digest(commit_seed(seed), commitment)
+
+
+def _lottery(n: int, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Boolean mask selecting k of n applicants uniformly at random, in O(n)"""
+    mask = np.zeros(n, dtype=bool)
+    if k >= n:
+        mask[:] = True
+    elif k > 0:
+        keys = rng.random(n)
+        mask[np.argpartition(keys, n - k)[n - k:]] = True
+    return mask
+
+
+def _apportion(quotas: Dict[str, float], total: int) -> Dict[str, int]:
+    """Round quotas down, then hand the `total` they fall short by to the largest fractions"""
+    lots = {c: int(q) for c, q in quotas.items()}
+    leftover = total - sum(lots.values())
+    # Ties go to the alphabetically first key: callers build quotas from sets, whose order varies
+    for c in sorted(sorted(quotas), key=lambda c: lots[c] - quotas[c])[:max(leftover, 0)]:
+        lots[c] += 1
+    return lots
+
+
+def _proportional(demand: np.ndarray, available: int, rng: np.random.Generator) -> np.ndarray:
+    """Allot lots in proportion to demand; leftover lots go by a lottery weighted by the remainders"""
+    total = int(demand.sum())
+    if total <= available:
+        return demand.copy()
+    share = demand * (available / total)
+    lots = np.floor(share).astype(np.int64)
+    remainder = share - lots
+    candidates = np.flatnonzero(remainder > 0)
+    leftover = min(available - int(lots.sum()), len(candidates))
+    if leftover > 0:
+        # Efraimidis-Spirakis weighted sampling without replacement: largest u^(1/w) wins
+        keys = np.log(rng.random(len(candidates))) / remainder[candidates]
+        winners = candidates[np.argpartition(keys, len(keys) - leftover)[len(keys) - leftover:]]
+        lots[winners] += 1
+    return lots
+
+
+class AllotmentResult:
+    """Lots allotted per application, with the seed and per-bucket summary needed for an audit"""
+
+    def __init__(self, lots: np.ndarray, seed: bytes, summary: pd.DataFrame):
+        self.lots = lots
+        self.seed = seed
+        self.commitment = commit_seed(seed)
+        self.summary = summary
+
+    @property
+    def alloted(self) -> np.ndarray:
+        return self.lots > 0
+
+    def digest(self) -> str:
+        """Hash of the allotted lots, so two runs can be compared without shipping the arrays"""
+        return hashlib.sha256(np.ascontiguousarray(self.lots, dtype='<i8').tobytes()).hexdigest()
+
+
+class AllotmentEngine:
+    """Seeded, vectorized IPO lottery over the applications DataFrame
+
+    Offered lots are split between categories by `category_shares`, then within each category
+    between buckets (by default residential_status and risk_category) in proportion to their
+    demand. Retail buckets run the minimum-lot lottery: if there are fewer lots than applicants,
+    a random subset gets one lot each; otherwise everyone gets one lot and the rest is allotted
+    proportionally. Applications for zero lots take no part. HNI buckets are allotted
+    proportionally to the lots applied for.
+    """
+
+    def __init__(self, lots_offered: int, lot_size: int = 1, price: float = 0.0,
+                 category_shares: Optional[Dict[str, float]] = None,
+                 bucket_by: Sequence[str] = DEFAULT_BUCKET_BY,
+                 seed: Union[int, bytes, str, None] = None):
+        self.lots_offered = int(lots_offered)
+        self.lot_size = lot_size
+        self.price = price
+        self.category_shares = category_shares or DEFAULT_CATEGORY_SHARES
+        self.bucket_by = list(bucket_by)
+        self.seed = seed_bytes(seed if seed is not None else secrets.token_bytes(16))
+
+    @property
+    def commitment(self) -> str:
+        return commit_seed(self.seed)
+
+    def categorize(self, db: pd.DataFrame, lots_applied: np.ndarray) -> np.ndarray:
+        """Investor category per application: an explicit 'category' column, else by amount"""
+        if 'category' in db:
+            return db['category'].astype(str).to_numpy()
+        amount = lots_applied * self.lot_size * self.price
+        return np.where(amount > RETAIL_LIMIT, HNI, RETAIL)
+
+    def _buckets(self, db: pd.DataFrame, categories: np.ndarray):
+        """(bucket code per row, bucket names like 'Retail|NRI'), combining integer codes, not strings"""
+        columns = [categories] + [db[c].to_numpy() for c in self.bucket_by if c in db]
+        combined = np.zeros(len(db), dtype=np.int64)
+        labels = []
+        for values in columns:
+            codes, uniques = pd.factorize(values, sort=True)
+            combined = combined * len(uniques) + codes
+            labels.append(np.asarray(uniques, dtype=str))
+        # The key space is tiny (categories x statuses), so compact it with bincount rather than a sort
+        present = np.bincount(combined)
+        keys = np.flatnonzero(present)
+        remap = np.zeros(len(present), dtype=np.int64)
+        remap[keys] = np.arange(len(keys))
+        codes = remap[combined]
+
+        # Decode each mixed-radix key back into its per-column labels
+        names = []
+        for key in keys.tolist():
+            parts = []
+            for uniques in reversed(labels):
+                key, digit = divmod(key, len(uniques))
+                parts.append(uniques[digit])
+            names.append('|'.join(reversed(parts)))
+        return codes, names
+
+    def _reservations(self, demand: Dict[str, int]) -> Dict[str, int]:
+        """Lots per category; what an undersubscribed category leaves over spills to the others
+
+        Both the shares and the spill are rounded by largest remainder, so no lot is lost to
+        rounding: every offered lot is reserved while some category still has unmet demand.
+        """
+        quotas = {c: self.lots_offered * self.category_shares.get(c, 0.0) for c in demand}
+        reserved = _apportion(quotas, min(self.lots_offered, round(sum(quotas.values()))))
+        surplus = sum(max(reserved[c] - demand[c], 0) for c in demand)
+        short = {c: demand[c] - reserved[c] for c in demand if demand[c] > reserved[c]}
+        total_short = sum(short.values())
+        if short and surplus:
+            spill = _apportion({c: surplus * s / total_short for c, s in short.items()}, min(surplus, total_short))
+            for c, lots in spill.items():
+                reserved[c] += min(lots, short[c])
+        return reserved
+
+    def allot(self, db: pd.DataFrame, lots_applied: Optional[np.ndarray] = None) -> AllotmentResult:
+        n = len(db)
+        if lots_applied is None:
+            lots_applied = db['lots_applied'].to_numpy() if 'lots_applied' in db else np.ones(n)
+        lots_applied = np.asarray(lots_applied, dtype=np.int64)
+        categories = self.categorize(db, lots_applied)
+
+        lots = np.zeros(n, dtype=np.int64)
+        if n == 0:
+            return AllotmentResult(lots, self.seed, pd.DataFrame())
+        codes, names = self._buckets(db, categories)
+
+        # Group rows by bucket once; each bucket is then a contiguous slice of `order`
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+        demand = np.bincount(codes, weights=lots_applied, minlength=len(names)).astype(np.int64)
+        applicants = np.bincount(codes, minlength=len(names))
+
+        # Split each category's reservation between its buckets in proportion to demand
+        bucket_category = np.array([name.split('|', 1)[0] for name in names])
+        available = np.zeros(len(names), dtype=np.int64)
+        present = np.unique(bucket_category).tolist()
+        category_demand = {c: int(demand[bucket_category == c].sum())
+                           for c in set(present) | set(self.category_shares)}
+        reservations = self._reservations(category_demand)
+        for category in present:
+            reserved = reservations[category]
+            members = np.flatnonzero(bucket_category == category)
+            available[members] = _proportional(demand[members], reserved,
+                                               np.random.default_rng(self._entropy(category)))
+
+        for b, name in enumerate(names):
+            rows = order[bounds[b]:bounds[b + 1]]
+            rng = np.random.default_rng(self._entropy(name))
+            applied = lots_applied[rows]
+            if bucket_category[b] == RETAIL:
+                # The minimum lot only goes to applicants who asked for at least one
+                bidders = np.flatnonzero(applied > 0)
+                allotted = np.zeros(len(rows), dtype=np.int64)
+                if available[b] < len(bidders):
+                    allotted[bidders] = _lottery(len(bidders), int(available[b]), rng)
+                else:
+                    allotted[bidders] = 1 + _proportional(applied[bidders] - 1, int(available[b]) - len(bidders), rng)
+            else:
+                allotted = _proportional(applied, int(available[b]), rng)
+            lots[rows] = allotted
+
+        allotted_lots = np.bincount(codes, weights=lots, minlength=len(names)).astype(np.int64)
+        winners = np.bincount(codes, weights=lots > 0, minlength=len(names)).astype(np.int64)
+        summary = pd.DataFrame({
+            'bucket': names,
+            'applicants': applicants,
+            'lots_applied': demand,
+            'lots_available': available,
+            'lots_allotted': allotted_lots,
+            'applicants_allotted': winners,
+            'subscription': np.divide(demand, available, out=np.full(len(names), np.inf),
+                                      where=available > 0),
+        })
+        return AllotmentResult(lots, self.seed, summary)
+
+    def _entropy(self, label: str) -> int:
+        """Per-bucket seed, so each bucket's draw is independent of how many buckets ran before it"""
+        return int.from_bytes(hashlib.sha256(self.seed + b'|' + label.encode()).digest(), 'big')
@@ -0,0 +1,9 @@
+from typing import Any
+
+# Kept free of numpy and pandas so the GUI can price an application before they are imported
+
+
+def parse_amount(text: Any) -> float:
+    """'₹6,800.00' -> 6800.0; for a price band like '₹1,560.00-1,700.00' the upper bound"""
+    text = str(text).replace('₹', '').replace(',', '').strip()
+    return float(text.rsplit('-', 1)[-1]) if text else 0.0
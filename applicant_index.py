@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import zipfile
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Bump when the on-disk layout changes so stale index files are rebuilt
+INDEX_VERSION = 2
+
+# Columns an index is built from; load_or_build_index reads them itself if db lacks them
+INDEX_COLUMNS = ('pan_number', 'aadhar_number')
+
+
+def aadhar_key(aadhar: Any) -> bytes:
+    """Hash an Aadhar number so the index never holds the raw identifier"""
+    if isinstance(aadhar, float) and aadhar.is_integer():
+        # pandas reads unquoted 12-digit numbers as float64
+        aadhar = int(aadhar)
+    normalized = str(aadhar).strip().replace(' ', '')
+    return hashlib.sha256(normalized.encode()).digest()[:16]
+
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    """(size, mtime) of the source file; a saved index is only reused if this matches"""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+class ApplicantIndex:
+    """Maps PAN (and optionally hashed Aadhar) to the row offset of the first matching application"""
+
+    def __init__(self):
+        self.by_pan: Dict[str, int] = {}
+        self.by_aadhar: Optional[Dict[bytes, int]] = None
+
+    @classmethod
+    def from_frame(cls, db: Any, with_aadhar: bool = True) -> 'ApplicantIndex':
+        """Build the index in one pass over the pan_number (and aadhar_number) columns"""
+        index = cls()
+        if 'pan_number' not in db:
+            return index
+        pans = db['pan_number'].tolist()
+        rows = range(len(pans) - 1, -1, -1)
+        # Inserting in reverse keeps the first occurrence, like user.iloc[0] on a boolean scan
+        index.by_pan = dict(zip(reversed(pans), rows))
+        if with_aadhar and 'aadhar_number' in db:
+            keys = [aadhar_key(a) for a in reversed(db['aadhar_number'].tolist())]
+            index.by_aadhar = dict(zip(keys, rows))
+        return index
+
+    def add(self, row: int, pan: str, aadhar: Any = None) -> None:
+        """Record a newly appended application; existing entries keep pointing at the first row"""
+        self.by_pan.setdefault(pan, row)
+        if self.by_aadhar is not None and aadhar is not None:
+            self.by_aadhar.setdefault(aadhar_key(aadhar), row)
+
+    def extend(self, start_row: int, rows: Iterable[Tuple[str, Any]]) -> None:
+        """Record a block of appended (pan, aadhar) applications starting at start_row"""
+        for offset, (pan, aadhar) in enumerate(rows):
+            self.add(start_row + offset, pan, aadhar)
+
+    def lookup_pan(self, pan: str) -> Optional[int]:
+        return self.by_pan.get(pan)
+
+    def lookup_aadhar(self, aadhar: Any) -> Optional[int]:
+        if self.by_aadhar is None:
+            return None
+        return self.by_aadhar.get(aadhar_key(aadhar))
+
+    def __len__(self) -> int:
+        return len(self.by_pan)
+
+    def __contains__(self, pan: str) -> bool:
+        return pan in self.by_pan
+
+    def save(self, path: str, fingerprint: Optional[Tuple[int, int]] = None) -> None:
+        """Write the index atomically, tagged with the fingerprint of the file it was built from
+
+        The file is an .npz of plain arrays (UTF-8 PAN bytes, Aadhar hashes, int64 rows) and a JSON
+        header, and is read back with allow_pickle=False: loading it never runs code from the file.
+        """
+        meta = {'version': INDEX_VERSION, 'fingerprint': list(fingerprint) if fingerprint else None,
+                'aadhar': self.by_aadhar is not None}
+        arrays = {
+            'meta': np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8),
+            'pan_keys': np.array([pan.encode('utf-8') for pan in self.by_pan], dtype=bytes),
+            'pan_rows': np.fromiter(self.by_pan.values(), dtype=np.int64, count=len(self.by_pan)),
+        }
+        if self.by_aadhar is not None:
+            arrays['aadhar_keys'] = np.array(list(self.by_aadhar), dtype='S16')
+            arrays['aadhar_rows'] = np.fromiter(self.by_aadhar.values(), dtype=np.int64, count=len(self.by_aadhar))
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        # A file object, so numpy does not append .npz to the name
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, fingerprint: Optional[Tuple[int, int]] = None) -> 'ApplicantIndex':
+        """Read an index written by save(); raises ValueError if it is stale, corrupt or from another version"""
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                meta = json.loads(arrays['meta'].tobytes())
+                if meta.get('version') != INDEX_VERSION:
+                    raise ValueError(f"Index {path} has version {meta.get('version')}, expected {INDEX_VERSION}")
+                if fingerprint is not None and tuple(meta.get('fingerprint') or ()) != tuple(fingerprint):
+                    raise ValueError(f"Index {path} is stale")
+                index = cls()
+                pans = [key.decode('utf-8') for key in arrays['pan_keys'].tolist()]
+                index.by_pan = dict(zip(pans, arrays['pan_rows'].tolist()))
+                if meta.get('aadhar'):
+                    # tolist() strips trailing NUL bytes from S16 values; pad them back
+                    keys = [key.ljust(16, b'\0') for key in arrays['aadhar_keys'].tolist()]
+                    index.by_aadhar = dict(zip(keys, arrays['aadhar_rows'].tolist()))
+        except (KeyError, EOFError, zipfile.BadZipFile, UnicodeDecodeError) as error:
+            raise ValueError(f"Index {path} is unreadable: {error}") from error
+        return index
+
+
+def load_or_build_index(db: Any, csv_path: str, index_path: Optional[str] = None) -> ApplicantIndex:
+    """Reuse the saved index for csv_path if it is current, otherwise build it from db and save it
+
+    db only needs the identifier columns when the index has to be rebuilt; without them they
+    are loaded from csv_path just for the build, so callers can leave them out of their frame.
+    """
+    index_path = index_path or f'{csv_path}.idx'
+    try:
+        fingerprint = file_fingerprint(csv_path)
+    except OSError:
+        return ApplicantIndex.from_frame(db)
+
+    try:
+        index = ApplicantIndex.load(index_path, fingerprint)
+        if len(index) <= len(db):
+            return index
+    except (OSError, ValueError):
+        pass
+
+    if 'pan_number' not in db:
+        from ingest import load_applications
+        db = load_applications(csv_path, columns=INDEX_COLUMNS)
+    index = ApplicantIndex.from_frame(db)
+    try:
+        index.save(index_path, fingerprint)
+    except OSError:
+        pass
+    return index
@@ -0,0 +1,43 @@
+"""Verification throughput of VerificationService as the worker count grows.
+
+Run from the repository root:
+    python benchmarks/bench_pool.py --proofs 2000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from verification_service import VerificationService
+from zkp_protocol import ZKPProtocol
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--proofs', type=int, default=2000, help="proofs to verify per run")
+    parser.add_argument('--chunk-size', type=int, default=128, help="proofs per worker job")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    identities = [f'PAN{i:07d}X' for i in range(args.proofs)]
+    baseline = None
+    for workers in sorted(set(args.workers)):
+        with VerificationService(ZKPProtocol, workers=workers) as service:
+            proofs = []
+            for start in range(0, len(identities), args.chunk_size):
+                proofs.extend(service.submit_create(identities[start:start + args.chunk_size]).result())
+            items = list(zip(identities, proofs))
+
+            start = time.perf_counter()
+            results = service.verify_many(items, chunk_size=args.chunk_size)
+            rate = len(items) / (time.perf_counter() - start)
+        if not all(results):
+            raise AssertionError("A valid proof was rejected")
+        baseline = baseline or rate
+        print(f"{workers:3d} workers: {rate:10.1f} proofs/s  ({rate / baseline:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Encode/decode throughput and size of the binary proof wire format.
+
+Run from the repository root:
+    python benchmarks/bench_wire.py --proofs 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nizk
+from zkp_protocol import ZKPProtocol
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--proofs', type=int, default=2000, help="proofs to encode and decode")
+    args = parser.parse_args()
+
+    zkp = ZKPProtocol()
+    # Encoding cost does not depend on the proof being valid, so reuse a few real ones
+    samples = [zkp.generate_noninteractive_proof(f'PAN{i:07d}X', b'bench') for i in range(16)]
+    proofs = [samples[i % len(samples)] for i in range(args.proofs)]
+
+    start = time.perf_counter()
+    buffer = nizk.encode_proofs(proofs, zkp.p)
+    encode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = list(nizk.iter_proofs(buffer, zkp.p))
+    decode_time = time.perf_counter() - start
+
+    if decoded != proofs:
+        raise AssertionError("Round trip changed a proof")
+    print(f"Proof size: {nizk.proof_size(zkp.p)} bytes")
+    print(f"Encode: {args.proofs / encode_time:12.0f} proofs/s")
+    print(f"Decode: {args.proofs / decode_time:12.0f} proofs/s")
+
+
+if __name__ == '__main__':
+    main()
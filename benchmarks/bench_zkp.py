@@ -0,0 +1,71 @@
+"""Proofs-per-second benchmark for ZKPProtocol, with and without fixed-base tables.
+
+Run from the repository root:
+    python benchmarks/bench_zkp.py --proofs 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from zkp_protocol import ZKPProtocol
+
+
+class PlainPow:
+    """Stand-in for FixedBaseExp that uses the builtin pow, i.e. the pre-table code path"""
+
+    def __init__(self, g, p):
+        self.g = g
+        self.p = p
+
+    def pow(self, e):
+        return pow(self.g, e, self.p)
+
+
+def run(zkp, create, identities):
+    """Return (proofs/s for create, proofs/s for verify)"""
+    start = time.perf_counter()
+    proofs = [create(identity) for identity in identities]
+    create_rate = len(identities) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for identity, proof in zip(identities, proofs):
+        if not zkp.verify_proof(identity, proof):
+            raise AssertionError(f"Proof for {identity} failed to verify")
+    verify_rate = len(identities) / (time.perf_counter() - start)
+    return create_rate, verify_rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--proofs', type=int, default=50, help="proofs per measurement")
+    args = parser.parse_args()
+
+    identities = [f'PAN{i:07d}X' for i in range(args.proofs)]
+
+    start = time.perf_counter()
+    zkp = ZKPProtocol()
+    print(f"Table setup: {time.perf_counter() - start:.3f}s "
+          f"({len(zkp.g_table.rows)} rows x {1 << zkp.g_table.window} entries)")
+
+    # ZKP_GUI's ZKPVerification is this class under another name, so one measurement covers both
+    plain = ZKPProtocol()
+    plain.g_table = PlainPow(plain.g, plain.p)
+
+    before = run(plain, plain.generate_proof, identities)
+    after = run(zkp, zkp.generate_proof, identities)
+    print(f"  create  before {before[0]:8.1f}/s  after {after[0]:8.1f}/s  ({after[0] / before[0]:.1f}x)")
+    print(f"  verify  before {before[1]:8.1f}/s  after {after[1]:8.1f}/s  ({after[1] / before[1]:.1f}x)")
+
+    items = [(identity, zkp.generate_proof(identity)) for identity in identities]
+    start = time.perf_counter()
+    if not all(zkp.verify_batch(items)):
+        raise AssertionError("Batch verification rejected a valid proof")
+    batch_rate = len(items) / (time.perf_counter() - start)
+    print(f"  batch   {batch_rate:8.1f}/s  ({batch_rate / after[1]:.1f}x over single verify)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Load generator for status_server.py: keep-alive connections, reports p50/p99 latency and req/s.
+
+Latency and throughput count answered requests only; 503 rejections are reported on their own,
+so a server that sheds load quickly does not look faster than one that serves it.
+
+Start the server, then from the repository root:
+    python benchmarks/loadgen_status.py --connections 64 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import load_applications
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def worker(host, port, bodies, counter, latencies, rejected, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            i = counter[0]
+            if i >= len(bodies):
+                return
+            counter[0] += 1
+            body = bodies[i]
+            request = (f'POST /status HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+                       f'Content-Length: {len(body)}\r\n\r\n').encode() + body
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.decode('latin-1').split('\r\n')[1:]:
+                name, _, value = line.partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            elapsed = time.perf_counter() - start
+            status = head.split(b' ', 2)[1].decode()
+            (rejected if status == '503' else latencies).append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args, bodies):
+    counter = [0]
+    latencies = []
+    rejected = []
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args.host, args.port, bodies, counter, latencies, rejected, statuses)
+                           for _ in range(args.connections)))
+    return time.perf_counter() - start, sorted(latencies), sorted(rejected), statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--connections', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--csv', default='ipo_applications.csv', help="PANs to query are taken from here")
+    args = parser.parse_args()
+
+    pans = load_applications(args.csv, columns=['pan_number'])['pan_number'].tolist()
+    bodies = [json.dumps({'pan': pans[i % len(pans)], 'aadhar': f'{i:012d}'}).encode()
+              for i in range(args.requests)]
+
+    elapsed, latencies, rejected, statuses = asyncio.run(run(args, bodies))
+    print(f"{len(latencies) + len(rejected)} requests over {args.connections} connections in {elapsed:.2f}s")
+    print(f"Answered: {len(latencies)} ({len(latencies) / elapsed:.1f} req/s)")
+    if latencies:
+        print(f"Latency p50: {percentile(latencies, 0.50) * 1e3:.1f} ms  "
+              f"p99: {percentile(latencies, 0.99) * 1e3:.1f} ms  max: {latencies[-1] * 1e3:.1f} ms")
+    if rejected:
+        print(f"Rejected (503): {len(rejected)} ({len(rejected) / elapsed:.1f} req/s), "
+              f"p50 {percentile(rejected, 0.50) * 1e3:.1f} ms to reject")
+    print(f"Status codes: {statuses}")
+
+
+if __name__ == '__main__':
+    main()
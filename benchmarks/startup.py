@@ -0,0 +1,118 @@
+"""Time to first paint of the GUIs, and the imports that ran before it, from -X importtime.
+
+Run from the repository root (needs a display):
+    python benchmarks/startup.py
+    python benchmarks/startup.py --eager --runs 5
+    python benchmarks/startup.py --script without_ZKP.py --save startup.json
+
+Each run starts a fresh interpreter with -X importtime and the script's --exit-after-paint flag.
+The wall time is measured from launch, so it includes interpreter startup; the import figures
+only count imports finished before the window painted, which is what the lazy startup trims.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports reported individually when they happen before the first paint
+HEAVY_MODULES = ('pandas', 'numpy', 'http.server')
+
+_IMPORT_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+_PAINT_LINE = re.compile(r'first-paint (\S+) (\S+)')
+
+
+def parse_importtime(lines: List[str]) -> List[Tuple[str, int, int, int]]:
+    """(module, nesting depth, self us, cumulative us) for each -X importtime line"""
+    imports = []
+    for line in lines:
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def run_once(script: str, extra: List[str], timeout: float) -> Dict[str, Any]:
+    """Launch the script once and split its import log at the first-paint line"""
+    launched = time.time()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', script, '--exit-after-paint', *extra],
+                          cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, timeout=timeout)
+    lines = proc.stderr.splitlines()
+    for position, line in enumerate(lines):
+        match = _PAINT_LINE.match(line)
+        if match:
+            break
+    else:
+        raise SystemExit(f"{script} exited with {proc.returncode} before reporting a first paint:\n"
+                         + '\n'.join(line for line in lines if not line.startswith('import time:'))[-2000:])
+    before = parse_importtime(lines[:position])
+    return {
+        'first_paint_s': float(match.group(2)) - launched,
+        'in_process_s': float(match.group(1)),
+        # Top-level entries already include their nested imports
+        'import_s': sum(cumulative for _, depth, _, cumulative in before if depth == 0) / 1e6,
+        'imports': before,
+        'imports_after_paint': len(parse_importtime(lines[position + 1:])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default='ZKP_GUI.py', help="GUI script to start")
+    parser.add_argument('--eager', action='store_true', help="pass --eager: the previous, non-lazy startup")
+    parser.add_argument('--runs', type=int, default=3, help="launches; the median is reported")
+    parser.add_argument('--top', type=int, default=15, help="slowest imports before first paint to list")
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--save', help="write the summary to this JSON file")
+    args = parser.parse_args()
+
+    extra = ['--eager'] if args.eager else []
+    runs = [run_once(args.script, extra, args.timeout) for _ in range(args.runs)]
+    # Break down the median run rather than mixing import timings across runs
+    runs.sort(key=lambda r: r['first_paint_s'])
+    median = runs[len(runs) // 2]
+    imported = {module for module, _, _, _ in median['imports']}
+
+    print(f"{args.script}{' --eager' if args.eager else ''}: {args.runs} run(s)")
+    print(f"  first paint        {statistics.median(r['first_paint_s'] for r in runs) * 1000:8.1f} ms from launch "
+          f"(min {runs[0]['first_paint_s'] * 1000:.1f}, max {runs[-1]['first_paint_s'] * 1000:.1f})")
+    print(f"  in process         {median['in_process_s'] * 1000:8.1f} ms from the script's first line")
+    print(f"  imports            {median['import_s'] * 1000:8.1f} ms in {len(median['imports'])} modules before paint, "
+          f"{median['imports_after_paint']} more after")
+    print("  loaded before paint " + ', '.join(f"{m} {'yes' if m in imported else 'no'}" for m in HEAVY_MODULES))
+    print("  slowest imports before paint (cumulative, self):")
+    slowest = sorted(median['imports'], key=lambda entry: entry[3], reverse=True)
+    shown = 0
+    for module, depth, self_us, cumulative_us in slowest:
+        # A package's cumulative time repeats its children's; list only the outermost few
+        if depth > 1:
+            continue
+        print(f"    {cumulative_us / 1000:8.1f} ms {self_us / 1000:8.1f} ms  {'  ' * depth}{module}")
+        shown += 1
+        if shown == args.top:
+            break
+
+    if args.save:
+        summary = {
+            'script': args.script,
+            'eager': args.eager,
+            'first_paint_s': [r['first_paint_s'] for r in runs],
+            'in_process_s': median['in_process_s'],
+            'import_s': median['import_s'],
+            'heavy_before_paint': sorted(m for m in HEAVY_MODULES if m in imported),
+            'imports': [{'module': m, 'depth': d, 'self_us': s, 'cumulative_us': c} for m, d, s, c in median['imports']],
+        }
+        with open(args.save, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"Saved to {args.save}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""Headless benchmark suite for the ZKP, lookup and allotment hot paths, with JSON baselines.
+
+Run from the repository root:
+    python benchmarks/suite.py --sizes 1k 100k --save baseline.json
+    python benchmarks/suite.py --sizes 1k 100k --compare baseline.json
+    python benchmarks/suite.py -k lookup --sizes 10M
+
+Each case reports per-operation latency (median, p90, p99 over repeated samples) and the peak
+memory one call allocates. --compare exits non-zero if any case's median regressed by more
+than --threshold. No window is opened.
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allotment import AllotmentEngine
+from applicant_index import ApplicantIndex
+from market_stats import MarketStatistics
+from synthetic import generate_applications, write_csv
+
+# A sample is timed over enough calls to last at least this long, so timer resolution is noise
+MIN_SAMPLE_SECONDS = 0.001
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+# Columns the sized cases need; building only these keeps 10M rows affordable
+FRAME_COLUMNS = ['pan_number', 'aadhar_number', 'residential_status', 'risk_category']
+
+Setup = Callable[[Optional[int]], Tuple[Callable[[], Any], int]]
+
+
+class Case:
+    def __init__(self, name: str, setup: Setup, sized: bool, max_size: Optional[int]):
+        self.name = name
+        self.setup = setup
+        self.sized = sized
+        self.max_size = max_size
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, sized: bool = False, max_size: Optional[int] = None):
+    """Register a benchmark; the setup returns (function to time, operations per call)"""
+    def register(setup: Setup) -> Setup:
+        CASES.append(Case(name, setup, sized, max_size))
+        return setup
+    return register
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower().replace('_', '')
+    if text and text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+@functools.lru_cache(maxsize=1)
+def applications(rows: int) -> pd.DataFrame:
+    """Synthetic applications of the given size, kept while consecutive cases use the same size"""
+    return generate_applications(rows, seed=rows, columns=FRAME_COLUMNS)
+
+
+@functools.lru_cache(maxsize=1)
+def _zkp():
+    from zkp_protocol import ZKPProtocol
+    return ZKPProtocol()
+
+
+def _identities(count: int) -> List[str]:
+    return [f'PAN{i:07d}X' for i in range(count)]
+
+
+@case('zkp.create_proof')
+def _create_proof(size):
+    zkp = _zkp()
+    return functools.partial(zkp.generate_proof, 'ABCDE1234F'), 1
+
+
+@case('zkp.verify_proof')
+def _verify_proof(size):
+    zkp = _zkp()
+    proof = zkp.generate_proof('ABCDE1234F')
+    return functools.partial(zkp.verify_proof, 'ABCDE1234F', proof), 1
+
+
+@case('zkp.verify_batch64')
+def _verify_batch(size):
+    zkp = _zkp()
+    items = [(identity, zkp.generate_proof(identity)) for identity in _identities(64)]
+    return functools.partial(zkp.verify_batch, items), len(items)
+
+
+@case('nizk.verify')
+def _nizk_verify(size):
+    zkp = _zkp()
+    proof = zkp.generate_noninteractive_proof('ABCDE1234F', b'bench')
+    return functools.partial(zkp.verify_noninteractive_proof, 'ABCDE1234F', proof, b'bench'), 1
+
+
+@case('lookup.index_build', sized=True)
+def _index_build(size):
+    db = applications(size)
+    return functools.partial(ApplicantIndex.from_frame, db), 1
+
+
+@case('lookup.pan', sized=True)
+def _lookup_pan(size):
+    db = applications(size)
+    index = ApplicantIndex.from_frame(db)
+    rng = np.random.default_rng(0)
+    # Half hits, half misses, in random order
+    pans = db['pan_number'].to_numpy()[rng.integers(size, size=500)].tolist()
+    pans += [f'ZZ{i:08d}' for i in range(500)]
+    rng.shuffle(pans)
+
+    def lookups():
+        lookup = index.lookup_pan
+        for pan in pans:
+            lookup(pan)
+    return lookups, len(pans)
+
+
+@case('lookup.scan', sized=True, max_size=1_000_000)
+def _lookup_scan(size):
+    """The boolean-mask scan the GUIs did before the index, for comparison"""
+    db = applications(size)
+    pan = db['pan_number'].iat[size // 2]
+    return lambda: db.index[db['pan_number'] == pan], 1
+
+
+@case('allotment.allot', sized=True)
+def _allot(size):
+    db = applications(size)
+    engine = AllotmentEngine(lots_offered=size // 2, seed=1)
+    return functools.partial(engine.allot, db), 1
+
+
+@case('stats.rebuild', sized=True)
+def _stats_rebuild(size):
+    db = applications(size)
+    allotment = AllotmentEngine(lots_offered=size // 2, seed=1).allot(db)
+    stats = MarketStatistics()
+    return functools.partial(stats.rebuild_applications, db, allotment), 1
+
+
+@case('ingest.load_csv', sized=True, max_size=1_000_000)
+def _ingest(size):
+    from ingest import read_typed
+    path = os.path.join(_scratch_dir(), f'applications_{size}.csv')
+    if not os.path.exists(path):
+        write_csv(path, size, seed=size)
+    return functools.partial(read_typed, path), 1
+
+
+@functools.lru_cache(maxsize=1)
+def _scratch_dir() -> str:
+    path = os.environ.get('BENCH_SCRATCH') or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.scratch')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def measure(fn: Callable[[], Any], ops: int, repeat: int, budget: float, min_samples: int = 3) -> Dict[str, Any]:
+    """Latency distribution per operation, plus the peak memory of one call"""
+    start = time.perf_counter()
+    fn()  # warm up caches and lazily built tables
+    first = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_SECONDS / first)) if first > 0 else 1000
+
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < repeat and (len(samples) < min_samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / (number * ops))
+
+    # Measured separately: tracing allocations slows the calls being timed
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    values = np.array(samples)
+    return {
+        'unit': 'seconds per op',
+        'ops_per_call': ops,
+        'calls_per_sample': number,
+        'samples': len(samples),
+        'min': float(values.min()),
+        'median': float(np.median(values)),
+        'mean': float(values.mean()),
+        'p90': float(np.percentile(values, 90)),
+        'p99': float(np.percentile(values, 99)),
+        'max': float(values.max()),
+        'stdev': float(values.std()),
+        'peak_bytes': int(peak),
+    }
+
+
+def _max_rss_bytes() -> Optional[int]:
+    """Peak resident memory of this process so far, including what tracemalloc cannot see"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1.0), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:7.2f} {unit}'
+    return f'{seconds / 1e-9:7.1f} ns'
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Names of cases whose median is more than `threshold` slower than in the baseline"""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if before.get('ops_per_call') != result['ops_per_call']:
+            print(f"  {name:32s} not comparable: the case now times a different unit of work")
+            continue
+        ratio = result['median'] / before['median'] if before['median'] else float('inf')
+        marker = 'REGRESSED' if ratio > 1 + threshold else 'improved' if ratio < 1 - threshold else ''
+        print(f"  {name:32s} {_format_time(before['median'])} -> {_format_time(result['median'])}  "
+              f"{ratio:5.2f}x  {marker}")
+        if marker == 'REGRESSED':
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['1k', '100k'], help="rows for sized cases, e.g. 1k 100k 10M")
+    parser.add_argument('-k', dest='select', default='', help="only run cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=30, help="samples per case")
+    parser.add_argument('--budget', type=float, default=2.0, help="seconds per case before stopping early")
+    parser.add_argument('--all-sizes', action='store_true', help="ignore per-case size limits")
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="JSON results to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="median slowdown counted as a regression")
+    args = parser.parse_args()
+
+    sizes = sorted(parse_size(s) for s in args.sizes)
+    results: Dict[str, Dict[str, Any]] = {}
+    print(f"{'case':32s} {'median':>10s} {'p90':>10s} {'p99':>10s} {'peak MB':>9s}  samples")
+    # Sized cases run size by size so each synthetic frame is generated once
+    plan = [(c, None) for c in CASES if not c.sized]
+    plan += [(c, size) for size in sizes for c in CASES
+             if c.sized and (args.all_sizes or c.max_size is None or size <= c.max_size)]
+    for bench, size in plan:
+        name = bench.name if size is None else f'{bench.name}[{size}]'
+        if args.select not in name:
+            continue
+        fn, ops = bench.setup(size)
+        result = measure(fn, ops, args.repeat, args.budget)
+        result['rows'] = size
+        results[name] = result
+        print(f"{name:32s} {_format_time(result['median']):>10s} {_format_time(result['p90']):>10s} "
+              f"{_format_time(result['p99']):>10s} {result['peak_bytes'] / 1e6:9.1f}  {result['samples']}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': _environment(), 'max_rss_bytes': _max_rss_bytes(), 'results': results},
+                      f, indent=2)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.compare} (commit {baseline['environment'].get('commit', '')[:10] or 'unknown'}):")
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
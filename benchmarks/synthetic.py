@@ -0,0 +1,121 @@
+"""Synthetic applicants with the same columns and value formats as ipo_applications.csv.
+
+    python benchmarks/synthetic.py applications_1m.csv --rows 1000000
+
+Generation is vectorized and, when writing a file, chunked, so 10M rows fit in bounded memory.
+Identifiers are plain digit strings rather than the spreadsheet-mangled floats of the sample.
+"""
+import argparse
+import os
+import sys
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import SCHEMA
+
+FIRST_NAMES = ['Rajesh', 'Priya', 'Amit', 'Deepika', 'Suresh', 'Neha', 'Vikram', 'Anjali', 'Mohammad',
+               'Sanjay', 'Pooja', 'Karthik', 'Anita', 'Rahul', 'Meena', 'Arjun', 'Kavya', 'Imran']
+LAST_NAMES = ['Kumar', 'Sharma', 'Patel', 'Singh', 'Reddy', 'Gupta', 'Malhotra', 'Desai', 'Khan',
+              'Verma', 'Mehta', 'Rajan', 'Kapoor', 'Joshi', 'Krishnan', 'Iyer', 'Nair', 'Das']
+OCCUPATIONS = ['Software Engineer', 'Doctor', 'Business Owner', 'Teacher', 'Chartered Accountant',
+               'Lawyer', 'Bank Manager', 'Architect', 'Consultant', 'Professor', 'Government Employee',
+               'Engineer', 'Business Analyst', 'Marketing Manager', 'Financial Advisor']
+RESIDENTIAL_STATUSES = ['Resident Individual', 'NRI']
+RISK_CATEGORIES = ['Low', 'Medium', 'High']
+
+COLUMNS = list(SCHEMA)
+CHUNK_ROWS = 500_000
+
+
+def _digits(rng: np.random.Generator, n: int, width: int, first: str = '1-9') -> np.ndarray:
+    """n random digit strings of the given width, built as raw bytes rather than per-row formatting"""
+    low = ord('1') if first == '1-9' else ord(first[0])
+    high = ord('9') if first == '1-9' else ord(first[-1])
+    codes = rng.integers(ord('0'), ord('9') + 1, size=(n, width), dtype=np.uint8)
+    codes[:, 0] = rng.integers(low, high + 1, size=n, dtype=np.uint8)
+    return codes.view(f'S{width}').ravel().astype(str)
+
+
+def _pans(rng: np.random.Generator, n: int) -> np.ndarray:
+    """PAN format: five letters, four digits, one letter"""
+    codes = np.empty((n, 10), dtype=np.uint8)
+    codes[:, :5] = rng.integers(ord('A'), ord('Z') + 1, size=(n, 5), dtype=np.uint8)
+    codes[:, 5:9] = rng.integers(ord('0'), ord('9') + 1, size=(n, 4), dtype=np.uint8)
+    codes[:, 9] = rng.integers(ord('A'), ord('Z') + 1, size=n, dtype=np.uint8)
+    return codes.view('S10').ravel().astype(str)
+
+
+def generate_applications(rows: int, seed: int = 0, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """A DataFrame of `rows` synthetic applications; pass `columns` to build only those (much cheaper)"""
+    rng = np.random.default_rng(seed)
+    wanted = set(columns if columns is not None else COLUMNS)
+    data = {}
+    # Values with few distinct forms are formatted once each and then picked by index
+    person = rng.integers(len(FIRST_NAMES) * len(LAST_NAMES), size=rows)
+    if 'name' in wanted:
+        names = np.array([f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES], dtype=object)
+        data['name'] = names[person]
+    if 'dob' in wanted:
+        dates = pd.date_range('1955-01-01', '2005-12-31').strftime('%d-%m-%Y').to_numpy(dtype=object)
+        data['dob'] = dates[rng.integers(len(dates), size=rows)]
+    if 'pan_number' in wanted:
+        data['pan_number'] = _pans(rng, rows)
+    if 'aadhar_number' in wanted:
+        data['aadhar_number'] = _digits(rng, rows, 12, first='2-9')
+    if 'demat_account' in wanted:
+        data['demat_account'] = _digits(rng, rows, 16)
+    if 'bank_account' in wanted:
+        data['bank_account'] = _digits(rng, rows, 15)
+    if 'phone_number' in wanted:
+        data['phone_number'] = _digits(rng, rows, 10, first='6-9')
+    if 'email' in wanted:
+        emails = np.array([f'{first.lower()}.{last[0].lower()}@email.com'
+                           for first in FIRST_NAMES for last in LAST_NAMES], dtype=object)
+        data['email'] = emails[person]
+    if 'annual_income' in wanted:
+        data['annual_income'] = rng.integers(3, 51, size=rows) * 100_000
+    if 'investment_experience_years' in wanted:
+        data['investment_experience_years'] = rng.integers(0, 26, size=rows)
+    if 'occupation' in wanted:
+        data['occupation'] = pd.Categorical.from_codes(rng.integers(len(OCCUPATIONS), size=rows), OCCUPATIONS)
+    if 'residential_status' in wanted:
+        data['residential_status'] = pd.Categorical.from_codes((rng.random(rows) < 0.15).astype(np.int8),
+                                                               RESIDENTIAL_STATUSES)
+    if 'kyc_verified' in wanted:
+        data['kyc_verified'] = rng.random(rows) < 0.97
+    if 'risk_category' in wanted:
+        codes = rng.choice(len(RISK_CATEGORIES), size=rows, p=[0.15, 0.65, 0.2])
+        data['risk_category'] = pd.Categorical.from_codes(codes, RISK_CATEGORIES)
+    return pd.DataFrame({c: data[c] for c in COLUMNS if c in data})
+
+
+def iter_chunks(rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS,
+                columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+    """The same applications in chunks; each chunk has its own seed, so output is reproducible"""
+    for number, start in enumerate(range(0, rows, chunk_rows)):
+        yield generate_applications(min(chunk_rows, rows - start), seed=seed * 1_000_003 + number, columns=columns)
+
+
+def write_csv(path: str, rows: int, seed: int = 0, chunk_rows: int = CHUNK_ROWS) -> None:
+    """Write a CSV in the registrar file's layout (TRUE/FALSE booleans, header once)"""
+    with open(path, 'w', newline='') as f:
+        for number, chunk in enumerate(iter_chunks(rows, seed, chunk_rows)):
+            chunk['kyc_verified'] = np.where(chunk['kyc_verified'], 'TRUE', 'FALSE')
+            chunk.to_csv(f, index=False, header=number == 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.seed)
+
+
+if __name__ == '__main__':
+    main()
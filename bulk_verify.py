@@ -0,0 +1,304 @@
+"""Bulk allotment-status check: stream a file of applicants and write one status per row.
+
+    python bulk_verify.py requests.csv results.csv --seed 42 --workers 8
+
+The input is CSV with a header naming 'pan' and 'aadhar' (or the registrar's 'pan_number' and
+'aadhar_number', so the application file itself can be checked), and optionally hex-encoded
+non-interactive proofs 'pan_proof' / 'aadhar_proof' (see nizk.py). Rows with proofs are verified
+in parallel batches; rows without are looked up and reported as unproven, and rows that cannot be
+parsed are reported as MALFORMED without stopping the run. Progress is checkpointed next to
+the output, and re-running the same command resumes where it stopped.
+"""
+import argparse
+import csv
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import metrics
+from applicant_index import file_fingerprint
+from status_server import PROOF_CONTEXT, ApplicationStore, _proof_bytes
+from verification_service import VerificationService
+from zkp_protocol import ZKPProtocol
+
+CHUNK_ROWS = 4096
+
+# Seconds between progress lines and between checkpoint writes
+REPORT_EVERY = 5.0
+CHECKPOINT_EVERY = 1.0
+
+OUTPUT_FIELDS = ('row', 'pan', 'status', 'verified')
+
+_PAN_COLUMNS = ('pan', 'pan_number')
+_AADHAR_COLUMNS = ('aadhar', 'aadhar_number')
+
+# Status for a row that could not be parsed (missing fields, proofs that are not hex)
+MALFORMED = 'MALFORMED'
+
+Row = Tuple[str, Optional[str], Optional[bytes], Optional[bytes]]
+
+
+class _LineCounter:
+    """Iterates a binary file as decoded lines, keeping the byte offset of what has been consumed
+
+    csv.reader pulls exactly the lines of each record, so after a record is yielded `offset`
+    is where the next one starts: a position the checkpoint can seek back to.
+    """
+
+    def __init__(self, f, offset: int = 0):
+        self.f = f
+        self.offset = offset
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.f:
+            self.offset += len(line)
+            # A corrupt line should fail on its own, as a malformed row, not end the run
+            yield line.decode('utf-8-sig' if self.offset == len(line) else 'utf-8', errors='replace')
+
+
+def _column(header: List[str], names: Sequence[str], required: bool = True) -> Optional[int]:
+    lowered = [h.strip().lower() for h in header]
+    for name in names:
+        if name in lowered:
+            return lowered.index(name)
+    if required:
+        raise SystemExit(f"Input has no {' or '.join(repr(n) for n in names)} column")
+    return None
+
+
+def _parse_record(record: List[str], pan_col: int, aadhar_col: int,
+                  pan_proof_col: Optional[int], aadhar_proof_col: Optional[int]) -> Row:
+    """(pan, aadhar, pan proof, aadhar proof); aadhar is None if the row is malformed"""
+    try:
+        return (
+            record[pan_col].strip().upper(),
+            record[aadhar_col].strip().upper(),
+            _proof_bytes(record[pan_proof_col]) if pan_proof_col is not None else None,
+            _proof_bytes(record[aadhar_proof_col]) if aadhar_proof_col is not None else None,
+        )
+    except (IndexError, ValueError):
+        metrics.count('bulk_malformed_rows')
+        return record[pan_col].strip().upper() if pan_col < len(record) else '', None, None, None
+
+
+def _read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+class BulkVerifier:
+    """Streams (PAN, Aadhar[, proofs]) rows to statuses with a bounded number of chunks in flight"""
+
+    def __init__(self, store: ApplicationStore, service: Optional[VerificationService],
+                 context: bytes = PROOF_CONTEXT, chunk_rows: int = CHUNK_ROWS):
+        self.store = store
+        self.service = service
+        self.context = context
+        self.chunk_rows = chunk_rows
+        self.stopping = False
+
+    def request_stop(self, *_: Any) -> None:
+        """SIGINT handler: stop after the chunk being written and checkpoint; a second Ctrl+C aborts
+
+        Letting KeyboardInterrupt land at an arbitrary point can leave the process pool half
+        started, with a worker the interpreter then waits on forever at exit.
+        """
+        self.stopping = True
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    def _submit(self, rows: List[Row]) -> Optional[Future]:
+        """Send every proof in the chunk to the pool as one batch; None if the chunk has no proofs"""
+        claims = []
+        for pan, aadhar, pan_proof, aadhar_proof in rows:
+            if pan_proof is not None:
+                claims.append((pan, pan_proof))
+            if aadhar_proof is not None:
+                claims.append((aadhar, aadhar_proof))
+        if not claims:
+            return None
+        if self.service is None:
+            raise SystemExit("Input contains proofs but no verification workers were started")
+        return self.service.submit_identity_batch(claims, self.context)
+
+    def _statuses(self, rows, verdicts: Optional[List[bool]]) -> Iterator[Tuple[str, str, str]]:
+        """(pan, status, verified) per row, consuming the claim verdicts in submission order"""
+        lookup = self.store.index.lookup_pan
+        alloted = self.store.alloted
+        verdicts = iter(verdicts or ())
+        for pan, aadhar, pan_proof, aadhar_proof in rows:
+            if aadhar is None:
+                yield pan, MALFORMED, 'no'
+                continue
+            proven = pan_proof is not None or aadhar_proof is not None
+            ok = all([next(verdicts) for proof in (pan_proof, aadhar_proof) if proof is not None])
+            if not ok:
+                yield pan, 'VERIFICATION FAILED', 'no'
+                continue
+            row = lookup(pan)
+            status = 'NOT FOUND' if row is None else 'ALLOTED' if alloted[row] else 'NOT ALLOTED'
+            yield pan, status, 'yes' if proven else 'unproven'
+
+    def run(self, input_path: str, output_path: str, checkpoint_path: Optional[str] = None,
+            log=sys.stderr) -> Dict[str, Any]:
+        """Check every row of input_path; raises KeyboardInterrupt after checkpointing if stopped"""
+        if threading.current_thread() is not threading.main_thread():
+            return self._run(input_path, output_path, checkpoint_path, log)
+        previous = signal.signal(signal.SIGINT, self.request_stop)
+        try:
+            return self._run(input_path, output_path, checkpoint_path, log)
+        finally:
+            signal.signal(signal.SIGINT, previous)
+
+    def _run(self, input_path: str, output_path: str, checkpoint_path: Optional[str], log) -> Dict[str, Any]:
+        self.stopping = False
+        checkpoint_path = checkpoint_path or output_path + '.ckpt'
+        fingerprint = list(file_fingerprint(input_path))
+        state = _read_checkpoint(checkpoint_path)
+        if state is not None and (state.get('input') != fingerprint
+                                  or state.get('commitment') != self.store.allotment.commitment):
+            raise SystemExit(f"{checkpoint_path} belongs to a different input or allotment; "
+                             f"delete it to start over")
+        resuming = state is not None
+        if not resuming:
+            state = {'input': fingerprint, 'commitment': self.store.allotment.commitment,
+                     'rows': 0, 'input_offset': 0, 'output_offset': 0}
+
+        with open(input_path, 'rb') as src, open(output_path, 'r+' if resuming else 'w',
+                                                 newline='', encoding='utf-8') as dst:
+            lines = _LineCounter(src)
+            reader = csv.reader(lines)
+            header = next(reader)
+            pan_col = _column(header, _PAN_COLUMNS)
+            aadhar_col = _column(header, _AADHAR_COLUMNS)
+            pan_proof_col = _column(header, ('pan_proof',), required=False)
+            aadhar_proof_col = _column(header, ('aadhar_proof',), required=False)
+
+            writer = csv.writer(dst)
+            if resuming:
+                # Anything written after the last checkpoint is redone
+                src.seek(state['input_offset'])
+                lines.offset = state['input_offset']
+                dst.seek(state['output_offset'])
+                dst.truncate()
+            else:
+                writer.writerow(OUTPUT_FIELDS)
+
+            # Chunks are written strictly in input order; the pool's own queue bounds how many
+            # are in flight, so memory stays constant however long the input is
+            in_flight: deque = deque()
+            max_in_flight = self.service.max_pending if self.service is not None else 1
+            row_number = state['rows']
+            started = last_report = last_checkpoint = time.perf_counter()
+            done_at_start = row_number
+
+            def checkpoint() -> None:
+                dst.flush()
+                state['output_offset'] = dst.tell()
+                _write_checkpoint(checkpoint_path, state)
+
+            def flush(keep: int) -> None:
+                """Write finished chunks, waiting on the oldest while more than `keep` are in flight"""
+                nonlocal row_number, last_report, last_checkpoint
+                while in_flight and (len(in_flight) > keep or in_flight[0][1] is None or in_flight[0][1].done()):
+                    rows, future, input_offset = in_flight.popleft()
+                    with metrics.timer('bulk_wait_seconds'):
+                        verdicts = future.result() if future is not None else None
+                    # Timed per chunk: a timer per row would cost as much as the lookup itself
+                    with metrics.timer('bulk_chunk_write_seconds'):
+                        for pan, status, verified in self._statuses(rows, verdicts):
+                            row_number += 1
+                            writer.writerow((row_number, pan, status, verified))
+                    metrics.count('bulk_rows', len(rows))
+                    state.update(rows=row_number, input_offset=input_offset)
+
+                    now = time.perf_counter()
+                    if now - last_checkpoint >= CHECKPOINT_EVERY:
+                        checkpoint()
+                        last_checkpoint = now
+                    if now - last_report >= REPORT_EVERY:
+                        rate = (row_number - done_at_start) / (now - started)
+                        print(f"{row_number:,} rows  {rate:,.0f} rows/s", file=log)
+                        last_report = now
+
+            chunk = []
+            for record in reader:
+                if not record:
+                    continue
+                chunk.append(_parse_record(record, pan_col, aadhar_col, pan_proof_col, aadhar_proof_col))
+                if len(chunk) >= self.chunk_rows:
+                    in_flight.append((chunk, self._submit(chunk), lines.offset))
+                    chunk = []
+                    flush(keep=max_in_flight - 1)
+                    if self.stopping:
+                        break
+            if self.stopping:
+                # Drop what is still queued; the checkpoint covers exactly the rows written
+                for _, future, _ in in_flight:
+                    if future is not None:
+                        future.cancel()
+                checkpoint()
+                print(f"Stopped after {row_number:,} rows", file=log)
+                raise KeyboardInterrupt
+            if chunk:
+                in_flight.append((chunk, self._submit(chunk), lines.offset))
+            flush(keep=0)
+
+            dst.flush()
+            state.update(rows=row_number, input_offset=lines.offset, output_offset=dst.tell())
+
+        elapsed = time.perf_counter() - started
+        processed = row_number - done_at_start
+        # Finished: the checkpoint is only needed to resume an interrupted run
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print(f"Done: {row_number:,} rows ({processed:,} this run) in {elapsed:.1f}s, "
+              f"{processed / elapsed if elapsed else 0:,.0f} rows/s", file=log)
+        return {'rows': row_number, 'processed': processed, 'seconds': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="CSV of applicants to check")
+    parser.add_argument('output', help="CSV to write statuses to")
+    parser.add_argument('--csv', default='ipo_applications.csv', help="applications file")
+    # Required: a random seed would give each run a new allotment, and a checkpoint could never be resumed
+    parser.add_argument('--seed', type=int, required=True, help="allotment lottery seed")
+    parser.add_argument('--workers', type=int, default=None, help="verification processes (default: all cores)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS, help="rows per verification batch")
+    parser.add_argument('--context', default=PROOF_CONTEXT.decode(), help="context the proofs were made for")
+    parser.add_argument('--no-proofs', action='store_true',
+                        help="input carries no proofs; skip starting verification workers")
+    args = parser.parse_args()
+
+    metrics.configure_from_env()
+    store = ApplicationStore(args.csv, args.seed)
+    print(f"Allotment seed commitment {store.allotment.commitment}", file=sys.stderr)
+    try:
+        if args.no_proofs:
+            BulkVerifier(store, None, args.context.encode(), args.chunk_rows).run(args.input, args.output)
+            return
+        with VerificationService(ZKPProtocol, workers=args.workers) as service:
+            BulkVerifier(store, service, args.context.encode(), args.chunk_rows).run(args.input, args.output)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume from the last checkpoint", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == '__main__':
+    main()
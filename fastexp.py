@@ -0,0 +1,239 @@
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import metrics
+
+# Environment variable naming a directory where fixed-base tables are cached
+TABLE_CACHE_ENV = 'ZKP_TABLE_CACHE'
+
+_TABLE_MAGIC = b'FBXT1\n'
+
+
+def _table_key(g: int, p: int, window: int, bits: int) -> str:
+    """Stable identifier for (g, p, window, bits), used for the on-disk cache"""
+    material = f'{g}:{p}:{window}:{bits}'.encode()
+    return hashlib.sha256(material).hexdigest()[:32]
+
+
+class FixedBaseExp:
+    """Windowed fixed-base exponentiation table for a single base g mod p"""
+
+    def __init__(self, g: int, p: int, window: int = 6, bits: Optional[int] = None,
+                 rows: Optional[List[List[int]]] = None):
+        self.g = g
+        self.p = p
+        self.window = window
+        # Exponents up to this many bits are served from the table
+        self.bits = bits if bits is not None else p.bit_length()
+        self.mask = (1 << window) - 1
+        self.rows = rows if rows is not None else self._build()
+
+    def _build(self) -> List[List[int]]:
+        """Precompute rows[i][d] = g^(d * 2^(window*i)) mod p"""
+        p = self.p
+        size = 1 << self.window
+        base = self.g % p
+        rows = []
+        for _ in range((self.bits + self.window - 1) // self.window):
+            row = [1] * size
+            acc = 1
+            for d in range(1, size):
+                acc = acc * base % p
+                row[d] = acc
+            rows.append(row)
+            # Next row's base is base^(2^window)
+            base = acc * base % p
+        return rows
+
+    @metrics.timed('modexp_seconds', "Time in modular exponentiation", method='fixed_base')
+    def pow(self, e: int) -> int:
+        """Return g^e mod p using only table multiplications (no squarings)"""
+        if e < 0 or e.bit_length() > self.bits:
+            return pow(self.g, e, self.p)
+        p = self.p
+        mask = self.mask
+        window = self.window
+        result = 1
+        for row in self.rows:
+            if not e:
+                break
+            d = e & mask
+            if d:
+                result = result * row[d] % p
+            e >>= window
+        return result
+
+    def save(self, path: str) -> None:
+        """Write the table as fixed-width big-endian integers"""
+        width = (self.p.bit_length() + 7) // 8
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_TABLE_MAGIC)
+            f.write(f'{_table_key(self.g, self.p, self.window, self.bits)} {self.window} {self.bits} {width}\n'.encode())
+            for row in self.rows:
+                f.write(b''.join(v.to_bytes(width, 'big') for v in row))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, g: int, p: int, window: int, bits: Optional[int] = None) -> 'FixedBaseExp':
+        """Load a table written by save(); raises ValueError if it does not match (g, p)"""
+        bits = bits if bits is not None else p.bit_length()
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(_TABLE_MAGIC):
+            raise ValueError(f"Not a fixed-base table: {path}")
+        header_end = data.index(b'\n', len(_TABLE_MAGIC))
+        key, win, tbits, width = data[len(_TABLE_MAGIC):header_end].decode().split()
+        win, tbits, width = int(win), int(tbits), int(width)
+        if key != _table_key(g, p, window, bits) or win != window or tbits != bits:
+            raise ValueError(f"Fixed-base table {path} does not match group parameters")
+
+        size = 1 << win
+        n_rows = (tbits + win - 1) // win
+        body = memoryview(data)[header_end + 1:]
+        if len(body) != n_rows * size * width:
+            raise ValueError(f"Truncated fixed-base table: {path}")
+        rows = []
+        offset = 0
+        for _ in range(n_rows):
+            row = []
+            for _ in range(size):
+                row.append(int.from_bytes(body[offset:offset + width], 'big'))
+                offset += width
+            rows.append(row)
+        return cls(g, p, window, tbits, rows)
+
+
+_TABLES: Dict[Tuple[int, int, int], FixedBaseExp] = {}
+
+
+def table_cache_path(g: int, p: int, window: int, cache_dir: str) -> str:
+    """Location of the on-disk table for (g, p, window) inside cache_dir"""
+    return os.path.join(cache_dir, f'fixed_base_{_table_key(g, p, window, p.bit_length())}.bin')
+
+
+def get_fixed_base(g: int, p: int, window: int = 6, cache_dir: Optional[str] = None) -> FixedBaseExp:
+    """Return the process-wide table for (g, p), loading or saving it on disk if a cache dir is set"""
+    key = (g, p, window)
+    table = _TABLES.get(key)
+    cache_dir = cache_dir or os.environ.get(TABLE_CACHE_ENV)
+    path = table_cache_path(g, p, window, cache_dir) if cache_dir else None
+
+    if table is None and path:
+        try:
+            table = FixedBaseExp.load(path, g, p, window)
+        except (OSError, ValueError):
+            table = None
+
+    if table is None:
+        table = FixedBaseExp(g, p, window)
+    if path and not os.path.exists(path):
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            table.save(path)
+        except OSError:
+            pass
+
+    _TABLES[key] = table
+    return table
+
+
+# Above this many bases multi_exp switches from Straus to Pippenger's bucket method
+PIPPENGER_THRESHOLD = 32
+
+
+@metrics.timed('modexp_seconds', method='multi_exp')
+def multi_exp(pairs: Iterable[Tuple[int, int]], p: int, window: int = 4) -> int:
+    """Compute prod(b_i^e_i) mod p with shared squarings (Straus, or Pippenger for many bases)"""
+    pairs = [(b % p, e) for b, e in pairs if e]
+    if not pairs:
+        return 1 % p
+    if any(e < 0 for _, e in pairs):
+        raise ValueError("multi_exp requires non-negative exponents")
+    if len(pairs) > PIPPENGER_THRESHOLD:
+        return _pippenger(pairs, p)
+
+    size = 1 << window
+    mask = size - 1
+    tables = []
+    for b, _ in pairs:
+        row = [1] * size
+        acc = 1
+        for d in range(1, size):
+            acc = acc * b % p
+            row[d] = acc
+        tables.append(row)
+
+    max_bits = max(e.bit_length() for _, e in pairs)
+    n_windows = (max_bits + window - 1) // window
+    result = 1
+    for i in range(n_windows - 1, -1, -1):
+        if result != 1:
+            for _ in range(window):
+                result = result * result % p
+        shift = i * window
+        for (_, e), row in zip(pairs, tables):
+            d = (e >> shift) & mask
+            if d:
+                result = result * row[d] % p
+    return result
+
+
+def _pippenger(pairs: List[Tuple[int, int]], p: int) -> int:
+    """Bucket method: per window, multiply each base into the bucket for its digit once"""
+    window = max(2, min(12, len(pairs).bit_length() - 2))
+    mask = (1 << window) - 1
+    max_bits = max(e.bit_length() for _, e in pairs)
+    result = 1
+    for i in range((max_bits + window - 1) // window - 1, -1, -1):
+        if result != 1:
+            for _ in range(window):
+                result = result * result % p
+        shift = i * window
+        buckets: List[Optional[int]] = [None] * (mask + 1)
+        for b, e in pairs:
+            d = (e >> shift) & mask
+            if d:
+                bucket = buckets[d]
+                buckets[d] = b if bucket is None else bucket * b % p
+        # prod_d bucket[d]^d, as a running product of suffix products
+        running = None
+        acc = 1
+        for d in range(mask, 0, -1):
+            bucket = buckets[d]
+            if bucket is not None:
+                running = bucket if running is None else running * bucket % p
+            if running is not None:
+                acc = acc * running % p
+        result = result * acc % p
+    return result
+
+
+def jacobi(a: int, n: int) -> int:
+    """Jacobi symbol (a/n) for odd positive n"""
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+_SAFE_PRIMES: Dict[int, bool] = {}
+
+
+def is_safe_prime(p: int) -> bool:
+    """Fermat-test p and (p-1)/2; cached, since the group modulus is a fixed constant"""
+    known = _SAFE_PRIMES.get(p)
+    if known is None:
+        q = (p - 1) // 2
+        known = p > 7 and p & 3 == 3 and pow(2, p - 1, p) == 1 and pow(2, q - 1, q) == 1
+        _SAFE_PRIMES[p] = known
+    return known
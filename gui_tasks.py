@@ -0,0 +1,174 @@
+import queue
+import sys
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import metrics
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# How often the Tk loop checks for finished work, and how long one check may spend running
+# callbacks before yielding back to Tk; together they keep a frame well under 16 ms
+POLL_MS = 10
+BUDGET_MS = 8
+
+# Lazy startup waits this long after the first paint before loading data in the background,
+# so the warm-up's imports don't compete with the window's first redraws for the GIL
+WARMUP_DELAY_MS = 200
+
+# The work is mostly pure-Python big-integer math, which holds the GIL: a second worker thread
+# adds no throughput and makes the Tk thread wait longer for the GIL (frames ~6 ms late at p99
+# with one worker, ~40 ms with two). Pass a process-based executor for real parallelism.
+WORKERS = 1
+
+
+class Task:
+    """One piece of background work and the callbacks waiting on it; callbacks run on the Tk thread"""
+
+    def __init__(self, key: Optional[Hashable]):
+        self.key = key
+        self.state = QUEUED
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.future: Optional[Future] = None
+        self._on_done: List[Callable[[Any], None]] = []
+        self._on_error: List[Callable[[BaseException], None]] = []
+        self._on_state: List[Callable[[str], None]] = []
+
+    def add_callbacks(self, on_done=None, on_error=None, on_state=None) -> None:
+        if on_done is not None:
+            self._on_done.append(on_done)
+        if on_error is not None:
+            self._on_error.append(on_error)
+        if on_state is not None:
+            self._on_state.append(on_state)
+            on_state(self.state)
+
+
+class TaskScheduler:
+    """Runs slow GUI work on an executor and delivers results back on the Tk thread
+
+    Workers never touch widgets: they push (task, state, value) onto a thread-safe queue, and
+    an after() poll on the Tk thread drains it within a time budget, so the event loop keeps
+    painting while the work runs. Submitting with a key that is already in flight attaches to
+    the running task instead of starting a duplicate.
+    """
+
+    def __init__(self, root, executor: Optional[Executor] = None, workers: int = WORKERS,
+                 poll_ms: int = POLL_MS, budget_ms: int = BUDGET_MS):
+        self.root = root
+        self._own_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(workers, 'gui-task')
+        self.poll_ms = poll_ms
+        self.budget = budget_ms / 1000
+        self._events: 'queue.SimpleQueue' = queue.SimpleQueue()
+        self._in_flight: Dict[Hashable, Task] = {}
+        self._poll_due = 0.0
+        # Worst observed delay of the poll behind schedule: a direct measure of frame latency
+        self.max_lag_ms = 0.0
+        self.coalesced = 0
+        self._closed = False
+        self._schedule_poll()
+
+    def submit(self, fn: Callable, *args, key: Optional[Hashable] = None,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[BaseException], None]] = None,
+               on_state: Optional[Callable[[str], None]] = None) -> Task:
+        """Run fn(*args) in the background; must be called from the Tk thread"""
+        task = self._in_flight.get(key) if key is not None else None
+        if task is not None:
+            self.coalesced += 1
+            task.add_callbacks(on_done, on_error, on_state)
+            return task
+
+        task = Task(key)
+        task.add_callbacks(on_done, on_error, on_state)
+        if key is not None:
+            self._in_flight[key] = task
+        task.future = self.executor.submit(self._run, task, fn, args)
+        return task
+
+    def _run(self, task: Task, fn: Callable, args) -> None:
+        self._events.put((task, RUNNING, None))
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._events.put((task, FAILED, e))
+        else:
+            self._events.put((task, DONE, result))
+
+    def _schedule_poll(self) -> None:
+        if not self._closed:
+            self._poll_due = time.perf_counter() + self.poll_ms / 1000
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        started = time.perf_counter()
+        self.max_lag_ms = max(self.max_lag_ms, (started - self._poll_due) * 1000)
+        deadline = started + self.budget
+        # Leave anything not handled within the budget for the next poll
+        while time.perf_counter() < deadline:
+            try:
+                task, state, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(task, state, value)
+        self._schedule_poll()
+
+    def _deliver(self, task: Task, state: str, value: Any) -> None:
+        task.state = state
+        if state in (DONE, FAILED) and self._in_flight.get(task.key) is task:
+            del self._in_flight[task.key]
+        for callback in task._on_state:
+            callback(state)
+        if state == DONE:
+            task.result = value
+            for callback in task._on_done:
+                callback(value)
+        elif state == FAILED:
+            task.error = value
+            for callback in task._on_error:
+                callback(value)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        if self._own_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def after_first_paint(root, callback: Callable[[], None]) -> None:
+    """Call callback() on the Tk thread once the window has been drawn for the first time
+
+    Tk has no paint event: this waits for the first Expose, lets the other pending window
+    events through (after(0) runs behind them), then flushes the redraws they scheduled.
+    """
+    def exposed(event) -> None:
+        root.unbind('<Expose>', binding)
+        root.after(0, painted)
+
+    def painted() -> None:
+        root.update_idletasks()
+        callback()
+
+    binding = root.bind('<Expose>', exposed, add='+')
+
+
+def report_first_paint(root, started: float, then: Optional[Callable[[], None]] = None) -> None:
+    """Print time to first paint to stderr, measured from `started` (a perf_counter reading)
+
+    The line carries the wall-clock time too, so benchmarks/startup.py can add the interpreter
+    startup it cannot see from inside. `then` runs afterwards, e.g. to close the window.
+    """
+    def painted() -> None:
+        seconds = time.perf_counter() - started
+        if metrics.enabled():
+            metrics.histogram('startup_seconds', "Time from import to first paint").observe(seconds)
+        print(f"first-paint {seconds:.6f} {time.time():.6f}", file=sys.stderr, flush=True)
+        if then is not None:
+            root.after(0, then)
+
+    after_first_paint(root, painted)
@@ -0,0 +1,82 @@
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple, float) on top of the key and g^x
+_ENTRY_OVERHEAD = 200
+
+
+def identity_digest(data: str) -> bytes:
+    """SHA-256 of an identifier; the cache is keyed on this, never on the identifier itself"""
+    return hashlib.sha256(data.encode()).digest()
+
+
+class IdentityCache:
+    """Bounded LRU (with optional TTL) of identity digest -> g^x mod p
+
+    x is the digest read as an integer, so it is not stored. Entries are evicted least-recently-used first once their estimated size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, ttl: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[bytes, Tuple[int, float, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, digest: bytes) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            y, stored_at, size = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[digest]
+                self.bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return y
+
+    def put(self, digest: bytes, y: int) -> None:
+        size = sys.getsizeof(digest) + sys.getsizeof(y) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(digest, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._entries[digest] = (y, time.monotonic(), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted[2]
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
@@ -0,0 +1,226 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from applicant_index import file_fingerprint
+
+# Bump when the cache layout changes so old caches are rebuilt
+CACHE_VERSION = 2
+
+# Rows parsed per read_csv chunk; bounds peak memory while ingesting
+CHUNK_ROWS = 200_000
+
+# Explicit column types for the registrar file. 'str' keeps the text exactly as written, so
+# identifiers are never parsed as float64; unknown columns are treated as 'str' too. The cache
+# stores 'str' columns as fixed-width UTF-8 bytes (S{n}), one byte per ASCII character.
+SCHEMA: Dict[str, str] = {
+    'name': 'str',
+    'dob': 'str',
+    'pan_number': 'str',
+    'aadhar_number': 'str',
+    'demat_account': 'str',
+    'bank_account': 'str',
+    'phone_number': 'str',
+    'email': 'str',
+    'annual_income': 'int64',
+    'investment_experience_years': 'int64',
+    'occupation': 'category',
+    'residential_status': 'category',
+    'kyc_verified': 'bool',
+    'risk_category': 'category',
+}
+
+TRUE_VALUES = ['TRUE', 'True', 'true', '1']
+FALSE_VALUES = ['FALSE', 'False', 'false', '0']
+
+
+def _read_chunks(csv_path: str, kinds: Dict[str, str], columns: Optional[Sequence[str]] = None,
+                 chunk_rows: int = CHUNK_ROWS):
+    """read_csv in chunks with the schema applied instead of inferred types"""
+    columns = list(columns if columns is not None else kinds)
+    dtypes = {c: (str if kinds[c] in ('str', 'category') else kinds[c]) for c in columns}
+    return pd.read_csv(
+        csv_path,
+        usecols=columns,
+        dtype=dtypes,
+        keep_default_na=False,
+        true_values=TRUE_VALUES,
+        false_values=FALSE_VALUES,
+        chunksize=chunk_rows,
+    )
+
+
+def _column_kinds(csv_path: str) -> Dict[str, str]:
+    header = pd.read_csv(csv_path, nrows=0).columns.tolist()
+    return {c: SCHEMA.get(c, 'str') for c in header}
+
+
+def _codes_dtype(n_categories: int) -> np.dtype:
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _scan(csv_path: str, kinds: Dict[str, str], chunk_rows: int) -> Tuple[int, Dict[str, int], Dict[str, List[str]]]:
+    """First pass: row count, max UTF-8 byte width of each string column and the categories seen"""
+    text_columns = [c for c, kind in kinds.items() if kind in ('str', 'category')]
+    widths = {c: 1 for c in text_columns if kinds[c] == 'str'}
+    categories: Dict[str, set] = {c: set() for c in text_columns if kinds[c] == 'category'}
+    rows = 0
+    for chunk in _read_chunks(csv_path, kinds, text_columns or list(kinds)[:1], chunk_rows):
+        if not len(chunk):
+            # A header-only file yields one empty chunk, whose max() is NaN
+            continue
+        rows += len(chunk)
+        for c in widths:
+            widths[c] = max(widths[c], int(chunk[c].str.encode('utf-8').str.len().max() or 0))
+        for c in categories:
+            categories[c].update(chunk[c].unique())
+    return rows, widths, {c: sorted(values) for c, values in categories.items()}
+
+
+def build_cache(csv_path: str, cache_dir: str, chunk_rows: int = CHUNK_ROWS) -> None:
+    """Stream csv_path into one .npy file per column plus meta.json, with bounded memory"""
+    fingerprint = file_fingerprint(csv_path)
+    kinds = _column_kinds(csv_path)
+    rows, widths, categories = _scan(csv_path, kinds, chunk_rows)
+
+    tmp_dir = f'{cache_dir}.{os.getpid()}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    arrays = {}
+    for c, kind in kinds.items():
+        if kind == 'str':
+            dtype = np.dtype(f'S{widths[c]}')
+        elif kind == 'category':
+            dtype = _codes_dtype(len(categories[c]))
+        else:
+            dtype = np.dtype(kind)
+        columns[c] = {'kind': kind, 'dtype': dtype.str, 'categories': categories.get(c)}
+        path = os.path.join(tmp_dir, f'{c}.npy')
+        if rows:
+            arrays[c] = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(rows,))
+        else:
+            # Zero-length files cannot be memory-mapped
+            np.save(path, np.empty(0, dtype=dtype))
+
+    start = 0
+    for chunk in _read_chunks(csv_path, kinds, chunk_rows=chunk_rows) if rows else ():
+        end = start + len(chunk)
+        for c, kind in kinds.items():
+            if kind == 'category':
+                codes = pd.Categorical(chunk[c], categories=categories[c]).codes
+                arrays[c][start:end] = codes
+            elif kind == 'str':
+                arrays[c][start:end] = chunk[c].str.encode('utf-8').to_numpy(dtype=arrays[c].dtype)
+            else:
+                arrays[c][start:end] = chunk[c].to_numpy(dtype=arrays[c].dtype)
+        start = end
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    meta = {'version': CACHE_VERSION, 'fingerprint': list(fingerprint), 'rows': rows, 'columns': columns}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+
+
+class ColumnarCache:
+    """Read-only view of a cache written by build_cache; columns are memory-mapped on first use"""
+
+    def __init__(self, cache_dir: str, meta: Dict[str, Any]):
+        self.cache_dir = cache_dir
+        self.meta = meta
+        self.rows: int = meta['rows']
+        self.columns: List[str] = list(meta['columns'])
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def open(cls, cache_dir: str, fingerprint: Optional[Tuple[int, int]] = None) -> 'ColumnarCache':
+        """Open the cache; raises ValueError if it is from another version or a different source file"""
+        with open(os.path.join(cache_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_VERSION:
+            raise ValueError(f"Cache {cache_dir} has version {meta.get('version')}, expected {CACHE_VERSION}")
+        if fingerprint is not None and tuple(meta['fingerprint']) != tuple(fingerprint):
+            raise ValueError(f"Cache {cache_dir} is stale")
+        return cls(cache_dir, meta)
+
+    def column(self, name: str) -> np.ndarray:
+        """Raw memory-mapped array (category columns return their integer codes)"""
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.load(os.path.join(self.cache_dir, f'{name}.npy'), mmap_mode='r' if self.rows else None)
+            self._arrays[name] = array
+        return array
+
+    def series(self, name: str) -> pd.Series:
+        info = self.meta['columns'][name]
+        array = self.column(name)
+        if info['kind'] == 'category':
+            values = pd.Categorical.from_codes(array, categories=info['categories'])
+            return pd.Series(values, name=name)
+        if info['kind'] == 'str':
+            # The one column kind that cannot stay memory-mapped: pandas needs a str per cell
+            return pd.Series([value.decode('utf-8') for value in array.tolist()], name=name, dtype=object)
+        return pd.Series(array, name=name, copy=False)
+
+    def to_frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame over the cached columns; numeric, bool and category columns stay memory-mapped
+
+        Text columns are decoded into Python strings, which dominates load time and memory for
+        large files, so callers should ask only for the text columns they use.
+        """
+        columns = list(columns if columns is not None else self.columns)
+        return pd.DataFrame({c: self.series(c) for c in columns}, copy=False)
+
+
+def read_typed(csv_path: str, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Parse csv_path with the explicit schema, without writing a cache"""
+    kinds = _column_kinds(csv_path)
+    frame = pd.concat(_read_chunks(csv_path, kinds, chunk_rows=chunk_rows), ignore_index=True)
+    for c, kind in kinds.items():
+        if kind == 'category':
+            frame[c] = frame[c].astype('category')
+    return frame
+
+
+def load_applications(csv_path: str, cache_dir: Optional[str] = None,
+                      columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load the applications file, (re)building its columnar cache only when the CSV changed
+
+    `columns` the file does not have are left out, so callers can list optional ones.
+    """
+    cache_dir = cache_dir or f'{csv_path}.cache'
+    # Raises FileNotFoundError for a missing CSV, same as pd.read_csv
+    fingerprint = file_fingerprint(csv_path)
+    try:
+        cache = ColumnarCache.open(cache_dir, fingerprint)
+        return cache.to_frame(_present(columns, cache.columns))
+    except (OSError, ValueError, KeyError):
+        pass
+
+    try:
+        build_cache(csv_path, cache_dir)
+    except OSError:
+        # Read-only install directory: parse directly instead
+        frame = read_typed(csv_path)
+        return frame if columns is None else frame[_present(columns, frame.columns)]
+    cache = ColumnarCache.open(cache_dir, fingerprint)
+    return cache.to_frame(_present(columns, cache.columns))
+
+
+def _present(columns: Optional[Sequence[str]], available: Sequence[str]) -> Optional[List[str]]:
+    if columns is None:
+        return None
+    available = set(available)
+    return [c for c in columns if c in available]
@@ -0,0 +1,201 @@
+import re
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from virtual_tree import ListSource, SubsetSource
+
+# Columns of the listing rows that are searchable: company name, issue open/close dates, status
+SEARCH_FIELDS = (0, 1, 2, 6)
+
+# Prefixes up to this length are precomputed: they match many words, so merging is too slow per keystroke
+SHORT_PREFIX = 2
+
+# In the fuzzy fallback, a word must share this fraction of the query term's trigrams
+FUZZY_THRESHOLD = 0.5
+
+_WORD = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """np.unique for integer arrays via sort-and-compare, which beats its hashing path here"""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def _trigrams(word: str) -> set:
+    padded = f' {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ListingSearchIndex:
+    """Word-prefix search over listing rows, answered from a sorted vocabulary
+
+    Every (word, row) pair is stored grouped by word, with the vocabulary sorted, so the rows
+    for any prefix are one contiguous slice found by bisection. A query that only extends the
+    previous one intersects with the previous result instead of starting over.
+    """
+
+    def __init__(self, rows: Sequence[tuple], fields: Sequence[int] = SEARCH_FIELDS):
+        self.rows = rows
+        word_ids: Dict[str, int] = {}
+        pair_words: List[int] = []
+        pair_rows: List[int] = []
+        for i, row in enumerate(rows):
+            text = ' '.join(str(row[f]) for f in fields if f < len(row))
+            for word in set(tokenize(text)):
+                pair_words.append(word_ids.setdefault(word, len(word_ids)))
+                pair_rows.append(i)
+
+        # Renumber words in sorted order, then group the pairs by word
+        self.vocabulary: List[str] = sorted(word_ids)
+        rank = np.empty(len(word_ids), dtype=np.int64)
+        rank[[word_ids[w] for w in self.vocabulary]] = np.arange(len(word_ids))
+        words = rank[np.asarray(pair_words, dtype=np.int64)]
+        order = np.argsort(words, kind='stable')
+        self.pair_rows = np.asarray(pair_rows, dtype=np.int32)[order]
+        self.word_offsets = np.searchsorted(words[order], np.arange(len(self.vocabulary) + 1))
+        self._mask = np.zeros(len(rows), dtype=bool)
+
+        self.short_prefixes: Dict[str, np.ndarray] = {}
+        sorted_words = words[order]
+        for length in range(1, SHORT_PREFIX + 1):
+            # Shorter words are not prefixed by any string of this length: 'x' would otherwise
+            # file its rows under 'x' again and replace the full length-1 entry
+            prefixes = sorted({w[:length] for w in self.vocabulary if len(w) >= length})
+            prefix_ids = {p: k for k, p in enumerate(prefixes)}
+            word_prefix = np.array([prefix_ids[w[:length]] if len(w) >= length else -1 for w in self.vocabulary],
+                                   dtype=np.int64)
+            pair_prefix = word_prefix[sorted_words]
+            long_enough = pair_prefix >= 0
+            # Sorting (prefix, row) keys groups each prefix's rows, in order and de-duplicated
+            keys = _sorted_unique(pair_prefix[long_enough] * max(1, len(rows)) + self.pair_rows[long_enough])
+            groups = keys // max(1, len(rows))
+            bounds = np.searchsorted(groups, np.arange(len(prefixes) + 1))
+            key_rows = (keys % max(1, len(rows))).astype(np.int32)
+            for k, prefix in enumerate(prefixes):
+                self.short_prefixes[prefix] = key_rows[bounds[k]:bounds[k + 1]]
+
+        self._trigram_words: Optional[Dict[str, List[int]]] = None
+        self._last_terms: List[str] = []
+        self._last_result: Optional[np.ndarray] = None
+
+    def prefix_rows(self, prefix: str) -> np.ndarray:
+        """Sorted row numbers having a word that starts with prefix"""
+        if len(prefix) <= SHORT_PREFIX:
+            return self.short_prefixes.get(prefix, np.empty(0, dtype=np.int32))
+        lo = bisect_left(self.vocabulary, prefix)
+        hi = bisect_left(self.vocabulary, prefix + '\U0010ffff', lo)
+        rows = self.pair_rows[self.word_offsets[lo]:self.word_offsets[hi]]
+        # A single word's rows are already sorted and unique
+        return rows if hi - lo <= 1 else _sorted_unique(rows)
+
+    def _intersect(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Intersection of two sorted row arrays in O(len(a) + len(b)), keeping order"""
+        if len(a) > len(b):
+            a, b = b, a
+        mask = self._mask
+        mask[b] = True
+        result = a[mask[a]]
+        mask[b] = False
+        return result
+
+    def search(self, query: str) -> np.ndarray:
+        """Row numbers, in listing order, where every query term prefixes some word"""
+        terms = tokenize(query)
+        if not terms:
+            self._last_terms, self._last_result = [], None
+            return np.arange(len(self.rows))
+
+        last = self._last_terms
+        if (self._last_result is not None and last and len(terms) >= len(last)
+                and terms[:len(last) - 1] == last[:-1] and terms[len(last) - 1].startswith(last[-1])):
+            # Each new or longer term can only narrow the previous result
+            result = self._last_result
+            new_terms = terms[len(last) - 1:]
+        else:
+            result = None
+            new_terms = terms
+        for term in sorted(new_terms, key=len, reverse=True):
+            rows = self.prefix_rows(term)
+            result = rows if result is None else self._intersect(result, rows)
+            if not len(result):
+                break
+
+        self._last_terms, self._last_result = terms, result
+        return result
+
+    def fuzzy_rows(self, term: str) -> np.ndarray:
+        """Rows with a word similar to term (shared trigrams), for typos that match nothing"""
+        if self._trigram_words is None:
+            index: Dict[str, List[int]] = defaultdict(list)
+            for word_id, word in enumerate(self.vocabulary):
+                for gram in _trigrams(word):
+                    index[gram].append(word_id)
+            self._trigram_words = dict(index)
+        grams = _trigrams(term)
+        scores: Counter = Counter()
+        for gram in grams:
+            scores.update(self._trigram_words.get(gram, ()))
+        needed = max(1, int(len(grams) * FUZZY_THRESHOLD))
+        words = [w for w, score in scores.items() if score >= needed]
+        if not words:
+            return np.empty(0, dtype=np.int32)
+        return _sorted_unique(np.concatenate([self.pair_rows[self.word_offsets[w]:self.word_offsets[w + 1]]
+                                         for w in words]))
+
+    def lookup(self, query: str) -> np.ndarray:
+        """Prefix matches, falling back to matching each term fuzzily if there are none"""
+        result = self.search(query)
+        terms = tokenize(query)
+        if len(result) or not terms:
+            return result
+        combined = None
+        for term in terms:
+            rows = self.prefix_rows(term)
+            if not len(rows):
+                rows = self.fuzzy_rows(term)
+            combined = rows if combined is None else self._intersect(combined, rows)
+        return combined
+
+
+class SearchController:
+    """Filters a VirtualTreeview as the user types into an Entry, debounced"""
+
+    def __init__(self, entry, listing, delay_ms: int = 120):
+        self.entry = entry
+        self.listing = listing
+        self.delay_ms = delay_ms
+        self.rows: Sequence[tuple] = []
+        self.index: Optional[ListingSearchIndex] = None
+        self._pending = None
+        entry.bind('<KeyRelease>', self._schedule, add='+')
+
+    def set_rows(self, rows: Sequence[tuple], index: Optional[ListingSearchIndex] = None) -> None:
+        """Show a new listing, re-applying whatever is in the search box; indexes it unless given an index"""
+        self.rows = rows
+        self.index = index if index is not None else ListingSearchIndex(rows)
+        self.apply()
+
+    def _schedule(self, event=None) -> None:
+        if self._pending is not None:
+            self.entry.after_cancel(self._pending)
+        self._pending = self.entry.after(self.delay_ms, self.apply)
+
+    def apply(self) -> None:
+        self._pending = None
+        if self.index is None:
+            return
+        query = self.entry.get()
+        if not query.strip():
+            self.listing.set_source(ListSource(self.rows))
+        else:
+            self.listing.set_source(SubsetSource(self.rows, self.index.lookup(query)))
@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from allotment import HNI, RETAIL, RETAIL_LIMIT
+from amounts import parse_amount
+
+# Listing statuses counted as active; closed issues are only part of the averages
+ACTIVE_STATUSES = ('Open', 'Upcoming')
+
+# Positions of the fields used from a listing row (see load_sample_data in the GUI)
+ISSUE_SIZE_FIELD = 5
+STATUS_FIELD = 6
+
+
+class Tally:
+    """Running count of items and count of those that succeeded, e.g. applications allotted"""
+
+    __slots__ = ('count', 'hits')
+
+    def __init__(self, count: int = 0, hits: int = 0):
+        self.count = count
+        self.hits = hits
+
+    @property
+    def rate(self) -> float:
+        return self.hits / self.count if self.count else 0.0
+
+
+class MarketStatistics:
+    """Running aggregates behind the Analysis tab
+
+    rebuild_listings / rebuild_applications recompute everything in one vectorized pass; after
+    that, add_listing, add_application and record_allotment keep the aggregates current in O(1)
+    each, so a refresh only formats numbers instead of rescanning the applications.
+    """
+
+    def __init__(self):
+        self.listings = 0
+        self.active_listings = 0
+        self.issue_size_total = 0.0
+        self.applications = 0
+        self.allotted = 0
+        # Per investor category: lots applied for, and lots on offer from the allotment
+        self.demand: Dict[str, int] = {}
+        self.supply: Dict[str, int] = {}
+        self.by_risk: Dict[str, Tally] = {}
+
+    def rebuild_listings(self, rows: Sequence[tuple]) -> None:
+        sizes = np.array([parse_amount(row[ISSUE_SIZE_FIELD]) for row in rows], dtype=np.float64)
+        statuses = np.array([row[STATUS_FIELD] for row in rows], dtype=object)
+        self.listings = len(rows)
+        self.active_listings = int(np.isin(statuses, ACTIVE_STATUSES).sum()) if len(rows) else 0
+        self.issue_size_total = float(sizes.sum())
+
+    def add_listing(self, row: tuple) -> None:
+        self.listings += 1
+        self.active_listings += row[STATUS_FIELD] in ACTIVE_STATUSES
+        self.issue_size_total += parse_amount(row[ISSUE_SIZE_FIELD])
+
+    def rebuild_applications(self, db: pd.DataFrame, allotment: Any = None) -> None:
+        """Recompute the application aggregates from the database and, if given, its AllotmentResult
+
+        Demand and supply per category come from the allotment summary, so they match the
+        categories the engine actually used; without an allotment every application is retail.
+        """
+        n = len(db)
+        alloted = allotment.alloted if allotment is not None else np.zeros(n, dtype=bool)
+        self.applications = n
+        self.allotted = int(np.count_nonzero(alloted))
+
+        self.demand, self.supply = {}, {}
+        if allotment is not None and len(allotment.summary):
+            # Summary buckets are 'Category|...'; add up each category's rows
+            summary = allotment.summary
+            category = summary['bucket'].str.split('|', n=1).str[0]
+            totals = summary.groupby(category)[['lots_applied', 'lots_available']].sum()
+            for category, (demand, supply) in totals.iterrows():
+                self.demand[str(category)] = int(demand)
+                self.supply[str(category)] = int(supply)
+        elif n:
+            lots = db['lots_applied'].to_numpy() if 'lots_applied' in db else np.ones(n)
+            self.demand[RETAIL] = int(lots.sum())
+
+        self.by_risk = {}
+        if 'risk_category' in db and n:
+            codes, names = pd.factorize(db['risk_category'].astype(str))
+            counts = np.bincount(codes, minlength=len(names))
+            hits = np.bincount(codes, weights=alloted, minlength=len(names))
+            self.by_risk = {str(name): Tally(int(c), int(h)) for name, c, h in zip(names, counts, hits)}
+
+    def add_application(self, lots: int = 1, category: Optional[str] = None,
+                        risk_category: Optional[str] = None, amount: float = 0.0) -> None:
+        """Count a new application; category defaults to Retail or HNI by amount, as in allotment"""
+        if category is None:
+            category = HNI if amount > RETAIL_LIMIT else RETAIL
+        self.applications += 1
+        self.demand[category] = self.demand.get(category, 0) + int(lots)
+        if risk_category is not None:
+            self.by_risk.setdefault(risk_category, Tally()).count += 1
+
+    def record_allotment(self, risk_category: Optional[str] = None, allotted: bool = True) -> None:
+        """Mark one counted application as allotted (or, with allotted=False, as no longer allotted)"""
+        step = 1 if allotted else -1
+        self.allotted += step
+        if risk_category is not None:
+            self.by_risk.setdefault(risk_category, Tally()).hits += step
+
+    @property
+    def average_issue_size(self) -> float:
+        return self.issue_size_total / self.listings if self.listings else 0.0
+
+    @property
+    def allotment_rate(self) -> float:
+        return self.allotted / self.applications if self.applications else 0.0
+
+    def subscription(self, category: Optional[str] = None) -> float:
+        """Times subscribed: lots applied for over lots on offer, overall or for one category"""
+        if category is None:
+            demand, supply = sum(self.demand.values()), sum(self.supply.values())
+        else:
+            demand, supply = self.demand.get(category, 0), self.supply.get(category, 0)
+        if not supply:
+            return float('inf') if demand else 0.0
+        return demand / supply
+
+    def summary_rows(self) -> List[Tuple[str, str]]:
+        """(label, value) pairs for display"""
+        rows = [
+            ("Total Active IPOs:", f"{self.active_listings}"),
+            ("Average Issue Size:", f"₹{self.average_issue_size:,.0f} Cr"),
+            ("Success Rate:", f"{self.allotment_rate:.0%}"),
+            ("Average Subscription:", f"{self.subscription():.1f}x"),
+        ]
+        for category in sorted(set(self.demand) | set(self.supply)):
+            rows.append((f"{category} Subscription:", f"{self.subscription(category):.1f}x"))
+        for risk in sorted(self.by_risk):
+            rows.append((f"Allotment Rate ({risk} Risk):", f"{self.by_risk[risk].rate:.0%}"))
+        return rows
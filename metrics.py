@@ -0,0 +1,399 @@
+"""Timers, counters and latency histograms for the hot paths, exported as Prometheus text or JSON.
+
+Disabled by default: instrumented code then pays one global flag check per call. Enable with
+enable() or by setting IPO_METRICS=1 before an entry point calls configure_from_env(), which
+also honours IPO_METRICS_PORT (serve /metrics and /metrics.json on localhost),
+IPO_METRICS_FILE (write on exit, JSON if it ends in .json) and IPO_PROFILE_INTERVAL (seconds
+between stack samples; folded stacks are served at /profile).
+"""
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as _Tally
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; spans table lookups (~100 ns) to CSV loads (seconds)
+DEFAULT_BUCKETS = (1e-6, 5e-6, 25e-6, 100e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3,
+                   50e-3, 100e-3, 250e-3, 500e-3, 1.0, 2.5, 5.0, 10.0)
+
+_enabled = False
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+class Counter:
+    def __init__(self, name: str, labels: Labels, help: str = ''):
+        self.name = name
+        self.labels = labels
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """Counts of observations per bucket, plus their sum; quantiles are estimated from the buckets"""
+
+    def __init__(self, name: str, labels: Labels, help: str = '', buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = labels
+        self.help = help
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus the +Inf overflow
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[slot] += 1
+            self.sum += value
+            self.count += 1
+
+    def merge(self, counts: List[int], total: float, count: int) -> None:
+        """Add another histogram's observations, e.g. from a worker process; buckets must match"""
+        with self._lock:
+            self.counts = [a + b for a, b in zip(self.counts, counts)]
+            self.sum += total
+            self.count += count
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+_lock = threading.Lock()
+_metrics: Dict[Tuple[str, Labels], Any] = {}
+# HELP text per metric name, from whichever registration supplied one
+_help: Dict[str, str] = {}
+_collectors: List[Callable[[], Dict[str, float]]] = []
+
+
+def _get(cls: type, name: str, labels: Dict[str, Any], help: str, **kwargs: Any) -> Any:
+    if help:
+        _help.setdefault(name, help)
+    key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+    metric = _metrics.get(key)
+    if metric is None:
+        with _lock:
+            metric = _metrics.get(key)
+            if metric is None:
+                metric = _metrics[key] = cls(name, key[1], help, **kwargs)
+    return metric
+
+
+def counter(name: str, help: str = '', **labels: Any) -> Counter:
+    return _get(Counter, name, labels, help)
+
+
+def histogram(name: str, help: str = '', buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> Histogram:
+    return _get(Histogram, name, labels, help, buckets=buckets)
+
+
+def count(name: str, amount: float = 1, **labels: Any) -> None:
+    if _enabled:
+        counter(name, **labels).inc(amount)
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram: Histogram):
+        self.histogram = histogram
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullTimer':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, **labels: Any):
+    """Context manager recording the block's duration into a histogram; a shared no-op when disabled"""
+    if not _enabled:
+        return _NULL_TIMER
+    return _Timer(histogram(name, **labels))
+
+
+def timed(name: str, help: str = '', **labels: Any) -> Callable[[Callable], Callable]:
+    """Decorator form of timer(); the histogram is resolved once, on first enabled call"""
+    def decorate(fn: Callable) -> Callable:
+        metric: List[Histogram] = []
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            if not metric:
+                metric.append(histogram(name, help, **labels))
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metric[0].observe(time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def register_collector(collect: Callable[[], Dict[str, float]]) -> None:
+    """Add a callable returning {gauge name: value}, read at export time (e.g. cache statistics)"""
+    with _lock:
+        _collectors.append(collect)
+
+
+def reset() -> None:
+    with _lock:
+        _metrics.clear()
+
+
+def drain() -> List[Tuple[str, Labels, str, Any]]:
+    """Return what every metric recorded since the last drain, as plain data, and zero it
+
+    Worker processes send this for merge(). The metrics themselves stay registered, since
+    timed() holds on to its histogram.
+    """
+    drained = []
+    for (name, labels), metric in _snapshot()[0]:
+        with metric._lock:
+            if isinstance(metric, Counter):
+                value, metric.value = metric.value, 0
+            else:
+                value = (metric.buckets, metric.counts, metric.sum, metric.count)
+                metric.counts, metric.sum, metric.count = [0] * len(metric.counts), 0.0, 0
+        if value and (not isinstance(value, tuple) or value[3]):
+            drained.append((name, labels, _help.get(name, ''), value))
+    return drained
+
+
+def merge(drained: List[Tuple[str, Labels, str, Any]]) -> None:
+    """Add metrics drained in another process into this one's"""
+    for name, labels, help, value in drained:
+        if isinstance(value, tuple):
+            buckets, counts, total, n = value
+            histogram(name, help, buckets, **dict(labels)).merge(counts, total, n)
+        else:
+            counter(name, help, **dict(labels)).inc(value)
+
+
+def _snapshot() -> Tuple[List[Tuple[Tuple[str, Labels], Any]], List[Callable[[], Dict[str, float]]]]:
+    """Sorted metrics and the collectors, copied under the lock: other threads may be registering"""
+    with _lock:
+        return sorted(_metrics.items()), list(_collectors)
+
+
+def _label_text(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+def _bound_text(bound: float) -> str:
+    return repr(float(bound))
+
+
+def to_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines: List[str] = []
+    described = set()
+    registered, collectors = _snapshot()
+    for (name, labels), metric in registered:
+        if isinstance(metric, Counter):
+            full = f'{name}_total'
+            if name not in described:
+                lines += [f'# HELP {full} {_help.get(name, name)}', f'# TYPE {full} counter']
+            lines.append(f'{full}{_label_text(labels)} {metric.value}')
+        else:
+            if name not in described:
+                lines += [f'# HELP {name} {_help.get(name, name)}', f'# TYPE {name} histogram']
+            cumulative = 0
+            for bound, bucket_count in zip(metric.buckets, metric.counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{_label_text(labels, (("le", _bound_text(bound)),))} {cumulative}')
+            lines.append(f'{name}_bucket{_label_text(labels, (("le", "+Inf"),))} {metric.count}')
+            lines.append(f'{name}_sum{_label_text(labels)} {metric.sum}')
+            lines.append(f'{name}_count{_label_text(labels)} {metric.count}')
+        described.add(name)
+    for collect in collectors:
+        for name, value in sorted(collect().items()):
+            lines += [f'# TYPE {name} gauge', f'{name} {value}']
+    return '\n'.join(lines) + '\n'
+
+
+def to_json() -> Dict[str, Any]:
+    counters, histograms = [], []
+    registered, collectors = _snapshot()
+    for (name, labels), metric in registered:
+        if isinstance(metric, Counter):
+            counters.append({'name': name, 'labels': dict(labels), 'value': metric.value})
+        else:
+            histograms.append({
+                'name': name,
+                'labels': dict(labels),
+                'count': metric.count,
+                'sum': metric.sum,
+                'mean': metric.sum / metric.count if metric.count else 0.0,
+                'p50': metric.quantile(0.5),
+                'p90': metric.quantile(0.9),
+                'p99': metric.quantile(0.99),
+            })
+    gauges = {}
+    for collect in collectors:
+        gauges.update(collect())
+    return {'counters': counters, 'histograms': histograms, 'gauges': gauges}
+
+
+def write(path: str) -> None:
+    """Write a snapshot: JSON if the path ends in .json, otherwise Prometheus text"""
+    text = json.dumps(to_json(), indent=2) if path.endswith('.json') else to_prometheus()
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack at a fixed interval and tallies the folded stacks
+
+    Output is the collapsed-stack format flamegraph tools read: 'frame;frame;frame count'.
+    Costs one sys._current_frames() walk per interval, independent of how hot the code is.
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: _Tally = _Tally()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return ''.join(f'{stack} {n}\n' for stack, n in self.samples.most_common())
+
+
+profiler: Optional[SamplingProfiler] = None
+
+
+def start_profiler(interval: float = 0.01) -> SamplingProfiler:
+    global profiler
+    if profiler is None:
+        profiler = SamplingProfiler(interval)
+    profiler.start()
+    return profiler
+
+
+def serve(port: int, host: str = '127.0.0.1'):
+    """Serve the metrics from a daemon thread; binds to localhost unless told otherwise"""
+    # Imported here: http.server pulls in email and http.client, a noticeable share of GUI startup
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            path = self.path.split('?', 1)[0]
+            if path == '/metrics':
+                body, kind = to_prometheus().encode(), 'text/plain; version=0.0.4'
+            elif path == '/metrics.json':
+                body, kind = json.dumps(to_json()).encode(), 'application/json'
+            elif path == '/profile' and profiler is not None:
+                body, kind = profiler.folded().encode(), 'text/plain'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', kind)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def configure_from_env() -> None:
+    """Apply the IPO_METRICS* environment variables; entry points call this once at startup"""
+    if os.environ.get('IPO_METRICS', '').lower() not in ('1', 'true', 'yes'):
+        return
+    enable()
+    interval = os.environ.get('IPO_PROFILE_INTERVAL')
+    if interval:
+        start_profiler(float(interval))
+    port = os.environ.get('IPO_METRICS_PORT')
+    if port:
+        serve(int(port))
+    path = os.environ.get('IPO_METRICS_FILE')
+    if path:
+        atexit.register(write, path)
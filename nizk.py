@@ -0,0 +1,128 @@
+import hashlib
+import secrets
+import struct
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+# Wire format: version, flags, then commitment | challenge | response as fixed-width big-endian
+WIRE_VERSION = 1
+FLAG_NONINTERACTIVE = 0x01
+CHALLENGE_BYTES = 16
+
+_HEADER = struct.Struct('>BB')
+_DOMAIN = b'secure-ipo-allotment/schnorr-fs/v1'
+
+
+def _width(p: int) -> int:
+    return (p.bit_length() + 7) // 8
+
+
+def _context_bytes(context: Union[bytes, str]) -> bytes:
+    return context.encode() if isinstance(context, str) else bytes(context)
+
+
+def fiat_shamir_challenge(g: int, p: int, y: int, commitment: int, context: Union[bytes, str] = b'') -> int:
+    """Challenge = SHA-256(domain, g, p, y, commitment, context) truncated to 128 bits"""
+    width = _width(p)
+    context = _context_bytes(context)
+    h = hashlib.sha256(_DOMAIN)
+    for value in (g, p, y, commitment % p):
+        h.update(value.to_bytes(width, 'big'))
+    h.update(len(context).to_bytes(4, 'big'))
+    h.update(context)
+    return int.from_bytes(h.digest()[:CHALLENGE_BYTES], 'big')
+
+
+def create_proof(zkp: Any, secret_data: str, context: Union[bytes, str] = b'') -> Dict[str, int]:
+    """Non-interactive proof of knowledge of x = H(secret_data); the challenge is a hash, not a coin"""
+    x, y = zkp.public_key(secret_data)
+    r = secrets.randbelow(zkp.p)
+    commitment = zkp.g_table.pow(r)
+    challenge = fiat_shamir_challenge(zkp.g, zkp.p, y, commitment, context)
+    return {'commitment': commitment, 'challenge': challenge, 'response': (r + challenge * x) % (zkp.p - 1)}
+
+
+def challenge_matches(zkp: Any, public_data: str, proof: Dict[str, int], context: Union[bytes, str] = b'') -> bool:
+    """True if the proof's challenge is the one the hash dictates for this statement and context"""
+    _, y = zkp.public_key(public_data)
+    try:
+        expected = fiat_shamir_challenge(zkp.g, zkp.p, y, proof['commitment'], context)
+    except (KeyError, TypeError, AttributeError, OverflowError):
+        return False
+    return proof.get('challenge') == expected
+
+
+def verify_proof(zkp: Any, public_data: str, proof: Dict[str, int], context: Union[bytes, str] = b'') -> bool:
+    return challenge_matches(zkp, public_data, proof, context) and zkp.verify_proof(public_data, proof)
+
+
+def verify_batch(zkp: Any, items: Sequence[Tuple[str, Dict[str, int]]],
+                 context: Union[bytes, str] = b'') -> List[bool]:
+    """Check each hashed challenge, then verify the rest with one batched equation"""
+    results = [challenge_matches(zkp, data, proof, context) for data, proof in items]
+    pending = [i for i, ok in enumerate(results) if ok]
+    for i, ok in zip(pending, zkp.verify_batch([items[i] for i in pending])):
+        results[i] = ok
+    return results
+
+
+def proof_size(p: int) -> int:
+    """Encoded size in bytes of one proof for modulus p"""
+    return _HEADER.size + 2 * _width(p) + CHALLENGE_BYTES
+
+
+def encode_proof(proof: Dict[str, int], p: int, noninteractive: bool = True) -> bytes:
+    """Fixed-length binary form of a proof"""
+    width = _width(p)
+    flags = FLAG_NONINTERACTIVE if noninteractive else 0
+    return b''.join((
+        _HEADER.pack(WIRE_VERSION, flags),
+        (proof['commitment'] % p).to_bytes(width, 'big'),
+        proof['challenge'].to_bytes(CHALLENGE_BYTES, 'big'),
+        proof['response'].to_bytes(width, 'big'),
+    ))
+
+
+def encode_proofs(proofs: Sequence[Dict[str, int]], p: int, noninteractive: bool = True) -> bytes:
+    """Concatenate encoded proofs into one buffer for storage or bulk transfer"""
+    return b''.join(encode_proof(proof, p, noninteractive) for proof in proofs)
+
+
+def decode_proof(data: Union[bytes, bytearray, memoryview], p: int, offset: int = 0,
+                 noninteractive: bool = True) -> Dict[str, int]:
+    """Decode one proof at `offset`; slices a memoryview, so the buffer itself is never copied
+
+    Raises ValueError unless the proof is of the expected kind (its flags byte) and every value
+    is canonical: commitment < p and response < p - 1, so each proof has exactly one encoding.
+    """
+    view = memoryview(data)
+    width = _width(p)
+    end = offset + proof_size(p)
+    if len(view) < end:
+        raise ValueError(f"Proof buffer too short: need {end} bytes, have {len(view)}")
+    version, flags = _HEADER.unpack_from(view, offset)
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported proof version {version}")
+    if flags & ~FLAG_NONINTERACTIVE:
+        raise ValueError(f"Unknown proof flags {flags:#04x}")
+    if bool(flags & FLAG_NONINTERACTIVE) != noninteractive:
+        raise ValueError(f"Proof is {'not ' if noninteractive else ''}marked non-interactive")
+    start = offset + _HEADER.size
+    commitment = int.from_bytes(view[start:start + width], 'big')
+    start += width
+    challenge = int.from_bytes(view[start:start + CHALLENGE_BYTES], 'big')
+    start += CHALLENGE_BYTES
+    response = int.from_bytes(view[start:start + width], 'big')
+    if commitment >= p or response >= p - 1:
+        raise ValueError("Non-canonical proof: commitment or response out of range")
+    return {'commitment': commitment, 'challenge': challenge, 'response': response}
+
+
+def iter_proofs(data: Union[bytes, bytearray, memoryview], p: int,
+                noninteractive: bool = True) -> Iterator[Dict[str, int]]:
+    """Decode every proof in a buffer produced by encode_proofs"""
+    size = proof_size(p)
+    view = memoryview(data)
+    if len(view) % size:
+        raise ValueError(f"Buffer length {len(view)} is not a multiple of the proof size {size}")
+    for offset in range(0, len(view), size):
+        yield decode_proof(view, p, offset, noninteractive)
@@ -0,0 +1,204 @@
+"""Headless allotment-status server: HTTP/1.1 + JSON over asyncio, with keep-alive.
+
+    python status_server.py --port 8080 --workers 8
+
+POST /status with {"pan": ..., "aadhar": ...} and optionally hex-encoded non-interactive
+proofs "pan_proof" / "aadhar_proof" (see nizk.py). GET /health reports liveness.
+"""
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from typing import Any, Dict, Optional, Tuple
+
+from allotment import INPUT_COLUMNS, AllotmentEngine
+from applicant_index import load_or_build_index
+from ingest import load_applications
+import metrics
+from verification_service import ServiceBusy, VerificationService
+from zkp_protocol import ZKPProtocol
+
+# Context bound into non-interactive proofs accepted by this server
+PROOF_CONTEXT = b'ipo-allotment-status'
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 16 * 1024
+IDLE_TIMEOUT = 30.0
+# How long a status check may wait for a verification slot before the server answers 503
+QUEUE_TIMEOUT = 5.0
+
+
+class ApplicationStore:
+    """Applications, their allotment and the PAN index; the same data the GUIs load"""
+
+    def __init__(self, csv_path: str = 'ipo_applications.csv', seed: Optional[int] = None):
+        # Only what the allotment reads; the index has its own file, or loads its columns itself
+        with metrics.timer('load_seconds', stage='applications'):
+            self.db = load_applications(csv_path, columns=INPUT_COLUMNS)
+        with metrics.timer('load_seconds', stage='allotment'):
+            self.allotment = AllotmentEngine(lots_offered=len(self.db) // 2, seed=seed).allot(self.db)
+        self.alloted = self.allotment.alloted
+        with metrics.timer('load_seconds', stage='index'):
+            self.index = load_or_build_index(self.db, csv_path)
+
+    def lookup(self, pan: str) -> Optional[bool]:
+        """Allotment status for a PAN, or None if there is no application"""
+        with metrics.timer('lookup_seconds', key='pan'):
+            row = self.index.lookup_pan(pan)
+        metrics.count('lookups', result='miss' if row is None else 'hit')
+        return None if row is None else bool(self.alloted[row])
+
+
+class StatusServer:
+    def __init__(self, store: ApplicationStore, service: VerificationService, queue_timeout: float = QUEUE_TIMEOUT):
+        self.store = store
+        self.service = service
+        self.queue_timeout = queue_timeout
+        # Waiting happens here, on the event loop, so a burst queues instead of being turned away;
+        # a request holding a slot always finds one free in the service
+        self._slots = asyncio.Semaphore(service.max_pending)
+
+    async def check_status(self, request: Dict[str, Any]) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        pan = str(request.get('pan', '')).strip().upper()
+        aadhar = str(request.get('aadhar', '')).strip().upper()
+        if not pan or not aadhar:
+            return HTTPStatus.BAD_REQUEST, {'error': "Please enter both PAN and Aadhar numbers"}
+
+        try:
+            claims = [(pan, _proof_bytes(request.get('pan_proof'))),
+                      (aadhar, _proof_bytes(request.get('aadhar_proof')))]
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': "Proofs must be hex-encoded"}
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            metrics.count('status_rejected', reason='queue_timeout')
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Server busy, please retry"}
+        try:
+            # Never blocks: the service frees its slot before this future's callbacks run
+            future = self.service.submit_identity_check(claims, PROOF_CONTEXT, timeout=0)
+            with metrics.timer('zkp_roundtrip_seconds'):
+                verified = await asyncio.wrap_future(future)
+        except ServiceBusy:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': "Server busy, please retry"}
+        finally:
+            self._slots.release()
+        if not verified:
+            return HTTPStatus.OK, {'status': 'VERIFICATION FAILED', 'alloted': False}
+
+        alloted = self.store.lookup(pan)
+        if alloted is None:
+            return HTTPStatus.OK, {'status': 'NOT FOUND', 'alloted': False}
+        return HTTPStatus.OK, {'status': 'ALLOTED' if alloted else 'NOT ALLOTED', 'alloted': alloted}
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, Dict[str, Any]]:
+        if path == '/health' and method == 'GET':
+            return HTTPStatus.OK, {'status': 'ok'}
+        if path != '/status':
+            return HTTPStatus.NOT_FOUND, {'error': "Not found"}
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': "Use POST"}
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': "Body must be JSON"}
+        if not isinstance(request, dict):
+            return HTTPStatus.BAD_REQUEST, {'error': "Body must be a JSON object"}
+        return await self.check_status(request)
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve requests on one connection until the client closes it or asks to"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await _respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {}, keep_alive=False)
+                    return
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, path, version = lines[0].split(' ', 2)
+                except ValueError:
+                    await _respond(writer, HTTPStatus.BAD_REQUEST, {'error': "Bad request line"}, keep_alive=False)
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    await _respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {}, keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version != 'HTTP/1.0' or connection == 'keep-alive')
+                status, payload = await self.handle(method, path.split('?', 1)[0], body)
+                await _respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _proof_bytes(value: Any) -> Optional[bytes]:
+    if value in (None, ''):
+        return None
+    return bytes.fromhex(str(value))
+
+
+async def _respond(writer: asyncio.StreamWriter, status: HTTPStatus, payload: Dict[str, Any],
+                   keep_alive: bool = True) -> None:
+    body = json.dumps(payload).encode()
+    head = (f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n')
+    writer.write(head.encode() + body)
+    await writer.drain()
+
+
+async def serve(host: str, port: int, store: ApplicationStore, service: VerificationService,
+                queue_timeout: float = QUEUE_TIMEOUT) -> None:
+    server = StatusServer(store, service, queue_timeout)
+    listener = await asyncio.start_server(server.serve_connection, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving allotment status on http://{host}:{port} "
+          f"({len(store.db)} applications, seed commitment {store.allotment.commitment})")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--csv', default='ipo_applications.csv', help="applications file")
+    parser.add_argument('--workers', type=int, default=None, help="verification processes (default: all cores)")
+    parser.add_argument('--max-pending', type=int, default=None, help="checks queued or running in the workers")
+    parser.add_argument('--queue-timeout', type=float, default=QUEUE_TIMEOUT,
+                        help="seconds a check may wait for a worker before answering 503")
+    parser.add_argument('--seed', type=int, default=None, help="allotment lottery seed")
+    args = parser.parse_args()
+
+    metrics.configure_from_env()
+    store = ApplicationStore(args.csv, args.seed)
+    with VerificationService(ZKPProtocol, workers=args.workers, max_pending=args.max_pending) as service:
+        try:
+            asyncio.run(serve(args.host, args.port, store, service, args.queue_timeout))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""AllotmentEngine: reproducibility, conservation of lots, and the per-row bounds"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from allotment import HNI, RETAIL, AllotmentEngine, commit_seed, verify_seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def applications(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'category': rng.choice([RETAIL, RETAIL, RETAIL, HNI], n),
+        'lots_applied': rng.integers(0, 12, n),
+        'residential_status': rng.choice(['Resident Individual', 'NRI'], n),
+        'risk_category': rng.choice(['Low', 'Medium', 'High'], n),
+    })
+
+
+def test_same_seed_same_result():
+    db = applications(5000)
+    first = AllotmentEngine(4000, seed=42).allot(db)
+    assert np.array_equal(first.lots, AllotmentEngine(4000, seed=42).allot(db).lots)
+    assert first.digest() != AllotmentEngine(4000, seed=43).allot(db).digest()
+    assert first.commitment == commit_seed(42) and verify_seed(42, first.commitment)
+    assert not verify_seed(43, first.commitment)
+
+
+def test_same_seed_same_result_across_processes():
+    # 5 lots split 3.5 / 1.5 between the categories, a rounding tie; categories pass through
+    # sets, whose order follows string hashing and so differs between processes
+    script = ("import sys; sys.path.insert(0, sys.argv[1]); sys.path.insert(0, sys.argv[2]);"
+              "from test_allotment import applications; from allotment import AllotmentEngine;"
+              "print(AllotmentEngine(5, seed=7).allot(applications(300)).digest())")
+    digests = {subprocess.run([sys.executable, '-c', script, ROOT, os.path.dirname(__file__)],
+                              env=dict(os.environ, PYTHONHASHSEED=str(h)), capture_output=True,
+                              text=True, check=True).stdout for h in (1, 2, 3)}
+    assert len(digests) == 1
+
+
+@pytest.mark.parametrize('offered', [0, 1, 7, 999, 10_000, 26_000, 10 ** 6])
+def test_lots_are_conserved_and_bounded(offered):
+    db = applications(5000, seed=offered)
+    result = AllotmentEngine(offered, seed=1).allot(db)
+    applied = db['lots_applied'].to_numpy()
+    assert result.lots.sum() == min(offered, applied.sum())
+    assert (result.lots >= 0).all() and (result.lots <= applied).all()
+    assert result.summary['lots_allotted'].sum() == result.lots.sum()
+
+
+def test_rounding_remainder_is_allotted():
+    db = pd.DataFrame({'residential_status': ['Resident Individual'] * 10})
+    assert AllotmentEngine(7, seed=1).allot(db).lots.sum() == 7
+    db = pd.DataFrame({'residential_status': ['Resident Individual'] * 1_000_000})
+    assert AllotmentEngine(666_666, seed=1).allot(db).lots.sum() == 666_666
+
+
+def test_retail_minimum_lot():
+    # Enough lots for everyone: each retail bidder gets at least one
+    db = applications(2000)
+    result = AllotmentEngine(10 ** 6, seed=1).allot(db)
+    retail = (db['category'] == RETAIL).to_numpy() & (db['lots_applied'] > 0).to_numpy()
+    assert (result.lots[retail] >= 1).all()
+    # Fewer lots than retail bidders: nobody gets more than one
+    result = AllotmentEngine(100, seed=1).allot(db)
+    assert result.lots[(db['category'] == RETAIL).to_numpy()].max() == 1
+
+
+def test_zero_lot_applications_get_nothing():
+    result = AllotmentEngine(5, seed=1).allot(pd.DataFrame({'lots_applied': [0, 0, 3]}))
+    assert result.lots.tolist() == [0, 0, 3]
+    db = applications(3000)
+    result = AllotmentEngine(50, seed=2).allot(db)
+    assert (result.lots[(db['lots_applied'] == 0).to_numpy()] == 0).all()
+    assert result.lots.sum() == 50
+
+
+def test_buckets_by_residence_and_risk():
+    result = AllotmentEngine(1000, seed=1).allot(applications(2000))
+    assert set(result.summary['bucket']) == {f'{c}|{r}|{k}' for c in (HNI, RETAIL)
+                                             for r in ('NRI', 'Resident Individual')
+                                             for k in ('High', 'Low', 'Medium')}
@@ -0,0 +1,90 @@
+"""ApplicantIndex: lookups, and the saved index file"""
+import os
+import pickle
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from applicant_index import ApplicantIndex, file_fingerprint, load_or_build_index
+
+DB = pd.DataFrame({
+    'pan_number': ['AAAAA0000A', 'BBBBB1111B', 'AAAAA0000A', 'CCCCC2222C'],
+    'aadhar_number': ['111122223333', '4444 5555 6666', '777788889999', 123456789012.0],
+})
+
+
+def test_lookups_find_the_first_application():
+    index = ApplicantIndex.from_frame(DB)
+    assert index.lookup_pan('AAAAA0000A') == 0
+    assert index.lookup_pan('CCCCC2222C') == 3
+    assert index.lookup_pan('ZZZZZ9999Z') is None
+    assert index.lookup_aadhar('444455556666') == 1
+    assert index.lookup_aadhar('123456789012') == 3
+    index.add(4, 'AAAAA0000A', '000000000000')
+    index.add(5, 'DDDDD3333D')
+    assert index.lookup_pan('AAAAA0000A') == 0 and index.lookup_pan('DDDDD3333D') == 5
+    assert len(index) == 4 and 'DDDDD3333D' in index
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = ApplicantIndex.from_frame(DB)
+    # A hash ending in NUL bytes must survive the fixed-width byte array
+    index.by_aadhar[b'\x01' * 14 + b'\0\0'] = 9
+    path = str(tmp_path / 'a.idx')
+    index.save(path, (10, 20))
+    loaded = ApplicantIndex.load(path, (10, 20))
+    assert loaded.by_pan == index.by_pan and loaded.by_aadhar == index.by_aadhar
+
+    without_aadhar = ApplicantIndex.from_frame(DB, with_aadhar=False)
+    without_aadhar.save(path)
+    assert ApplicantIndex.load(path).by_aadhar is None
+
+
+def test_stale_or_corrupt_files_are_rejected(tmp_path):
+    path = str(tmp_path / 'a.idx')
+    ApplicantIndex.from_frame(DB).save(path, (10, 20))
+    with pytest.raises(ValueError, match='stale'):
+        ApplicantIndex.load(path, (10, 21))
+    data = open(path, 'rb').read()
+    for blob in (b'', data[:len(data) // 2], b'not an index'):
+        with open(path, 'wb') as f:
+            f.write(blob)
+        with pytest.raises(ValueError):
+            ApplicantIndex.load(path)
+
+
+class _Payload:
+    """Unpickling this would create the marker file"""
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __reduce__(self):
+        return open, (self.marker, 'w')
+
+
+def test_pickled_index_is_never_unpickled(tmp_path):
+    csv_path = str(tmp_path / 'applications.csv')
+    DB.to_csv(csv_path, index=False)
+    marker = str(tmp_path / 'pwned')
+    with open(csv_path + '.idx', 'wb') as f:
+        pickle.dump((1, file_fingerprint(csv_path), _Payload(marker), None), f)
+
+    index = load_or_build_index(DB, csv_path)
+    assert not os.path.exists(marker)
+    assert index.lookup_pan('BBBBB1111B') == 1
+    # The pickle was replaced by a rebuilt index
+    assert ApplicantIndex.load(csv_path + '.idx', file_fingerprint(csv_path)).by_pan == index.by_pan
+
+
+def test_load_or_build_reuses_the_saved_index(tmp_path):
+    csv_path = str(tmp_path / 'applications.csv')
+    DB.to_csv(csv_path, index=False)
+    built = load_or_build_index(DB, csv_path)
+    # Identifier columns are not needed once the index is on disk
+    reused = load_or_build_index(DB[[]], csv_path)
+    assert reused.by_pan == built.by_pan
+    assert reused.lookup_aadhar('777788889999') == 2
@@ -0,0 +1,106 @@
+"""BulkVerifier: malformed rows, and resuming an interrupted run"""
+import csv
+import io
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nizk
+from bulk_verify import MALFORMED, BulkVerifier
+from status_server import PROOF_CONTEXT, ApplicationStore
+from verification_service import VerificationService
+from zkp_protocol import ZKPProtocol
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def store(tmp_path_factory):
+    # A copy, so the cache and index files are written next to it rather than into the repository
+    path = tmp_path_factory.mktemp('applications') / 'ipo_applications.csv'
+    shutil.copy(os.path.join(ROOT, 'ipo_applications.csv'), path)
+    return ApplicationStore(str(path), seed=3)
+
+
+@pytest.fixture(scope='module')
+def service():
+    with VerificationService(ZKPProtocol, workers=1) as service:
+        yield service
+
+
+def encoded(zkp, data):
+    return nizk.encode_proof(zkp.generate_noninteractive_proof(data, PROOF_CONTEXT), zkp.p).hex()
+
+
+def write_input(path, store):
+    zkp = ZKPProtocol()
+    with open(os.path.join(ROOT, 'ipo_applications.csv'), newline='') as f:
+        pans = [row['pan_number'] for row in csv.DictReader(f)]
+    lines = [['pan', 'aadhar', 'pan_proof', 'aadhar_proof']]
+    for i in range(40):
+        pan, aadhar = pans[i % len(pans)], f'{i:012d}'
+        if i % 3 == 0:
+            lines.append([pan, aadhar, '', ''])
+        elif i % 3 == 1:
+            lines.append([pan, aadhar, encoded(zkp, pan), encoded(zkp, aadhar)])
+        else:
+            # Proof for a different identity
+            lines.append([pan, aadhar, encoded(zkp, pan + 'X'), ''])
+    lines.insert(6, [pans[0], '000000000001', 'zz', ''])
+    lines.insert(11, [pans[1]])
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(lines)
+
+
+def read_output(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+class StoppingVerifier(BulkVerifier):
+    """Asks to stop, as Ctrl+C would, once `after` chunks have been submitted"""
+
+    def __init__(self, *args, after, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.after = after
+
+    def _submit(self, rows):
+        self.after -= 1
+        if self.after == 0:
+            self.stopping = True
+        return super()._submit(rows)
+
+
+def test_malformed_rows_do_not_stop_the_run(tmp_path, store, service):
+    source, output = tmp_path / 'in.csv', tmp_path / 'out.csv'
+    write_input(source, store)
+    result = BulkVerifier(store, service, chunk_rows=4).run(str(source), str(output), log=io.StringIO())
+
+    rows = read_output(output)
+    assert result['rows'] == 42 == len(rows) - 1
+    assert [row[2] for row in rows if row[2] == MALFORMED] == [MALFORMED, MALFORMED]
+    assert rows[6][2] == MALFORMED and rows[11][2] == MALFORMED
+    statuses = {row[3] for row in rows[1:] if row[2] != MALFORMED}
+    assert statuses == {'yes', 'no', 'unproven'}
+    assert not os.path.exists(f'{output}.ckpt')
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path, store, service):
+    source = tmp_path / 'in.csv'
+    write_input(source, store)
+    log = io.StringIO()
+    BulkVerifier(store, service, chunk_rows=4).run(str(source), str(tmp_path / 'whole.csv'), log=log)
+
+    resumed = str(tmp_path / 'resumed.csv')
+    with pytest.raises(KeyboardInterrupt):
+        StoppingVerifier(store, service, chunk_rows=4, after=8).run(str(source), resumed, log=log)
+    assert os.path.exists(f'{resumed}.ckpt')
+    assert 1 < len(read_output(resumed)) < 43
+
+    result = BulkVerifier(store, service, chunk_rows=4).run(str(source), resumed, log=log)
+    assert result['processed'] < result['rows'] == 42
+    assert read_output(resumed) == read_output(tmp_path / 'whole.csv')
@@ -0,0 +1,80 @@
+"""Typed CSV loading through the columnar cache"""
+import csv
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest import SCHEMA, load_applications, read_typed
+
+ROWS = [
+    {'name': 'Rajesh Kumar', 'dob': '15-03-1985', 'pan_number': 'SPBMZ8436E', 'aadhar_number': '012345678901',
+     'demat_account': '0012000034567890', 'bank_account': '5649310000000001', 'phone_number': '9370373920',
+     'email': 'rajesh.k@email.com', 'annual_income': '1500000', 'investment_experience_years': '8',
+     'occupation': 'Software Engineer', 'residential_status': 'Resident Individual', 'kyc_verified': 'TRUE',
+     'risk_category': 'Medium'},
+    {'name': 'Zoë Ñúñez 李', 'dob': '01-01-1990', 'pan_number': 'ABCDE1234F', 'aadhar_number': '000000000007',
+     'demat_account': '', 'bank_account': '1', 'phone_number': '0000000000',
+     'email': 'z@example.com', 'annual_income': '0', 'investment_experience_years': '0',
+     'occupation': 'Doctor', 'residential_status': 'NRI', 'kyc_verified': 'false',
+     'risk_category': 'High'},
+]
+
+
+def write(path, rows, fields=tuple(SCHEMA)):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return str(path)
+
+
+def check_frame(frame):
+    assert list(frame.columns) == list(SCHEMA)
+    for column, kind in SCHEMA.items():
+        if kind == 'category':
+            assert isinstance(frame[column].dtype, pd.CategoricalDtype), column
+        elif kind != 'str':
+            assert frame[column].dtype == kind, column
+    # Identifiers keep their leading zeros, text survives as written
+    for column in SCHEMA:
+        expected = [row[column] for row in ROWS]
+        if SCHEMA[column] == 'int64':
+            expected = [int(v) for v in expected]
+        elif SCHEMA[column] == 'bool':
+            expected = [v.lower() == 'true' for v in expected]
+        assert frame[column].tolist() == expected, column
+
+
+def test_round_trip_through_the_cache(tmp_path):
+    path = write(tmp_path / 'applications.csv', ROWS)
+    check_frame(load_applications(path))
+    assert os.path.isdir(path + '.cache')
+    # Served from the cache the second time
+    check_frame(load_applications(path))
+    check_frame(read_typed(path))
+
+
+def test_selected_columns(tmp_path):
+    path = write(tmp_path / 'applications.csv', ROWS)
+    frame = load_applications(path, columns=['risk_category', 'not_a_column', 'pan_number'])
+    assert list(frame.columns) == ['risk_category', 'pan_number']
+    assert frame['pan_number'].tolist() == ['SPBMZ8436E', 'ABCDE1234F']
+
+
+def test_rebuilt_when_the_file_changes(tmp_path):
+    path = write(tmp_path / 'applications.csv', ROWS)
+    assert len(load_applications(path)) == 2
+    write(path, ROWS[:1])
+    assert load_applications(path)['name'].tolist() == ['Rajesh Kumar']
+
+
+def test_header_only_file(tmp_path):
+    path = write(tmp_path / 'applications.csv', [])
+    frame = load_applications(path)
+    assert frame.shape == (0, len(SCHEMA)) and list(frame.columns) == list(SCHEMA)
+    assert frame['annual_income'].dtype == 'int64'
+    assert len(load_applications(path, columns=['residential_status'])) == 0
+    assert len(read_typed(path)) == 0
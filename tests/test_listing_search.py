@@ -0,0 +1,51 @@
+"""ListingSearchIndex against a brute-force scan of the same rows"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from listing_search import SEARCH_FIELDS, ListingSearchIndex, tokenize
+
+
+def brute_force(rows, query):
+    terms = tokenize(query)
+    matches = []
+    for i, row in enumerate(rows):
+        words = tokenize(' '.join(str(row[f]) for f in SEARCH_FIELDS if f < len(row)))
+        if all(any(word.startswith(term) for word in words) for term in terms):
+            matches.append(i)
+    return matches
+
+
+def listing(name, day):
+    return (name, f"Nov {day:02d}, 2024", f"Nov {day + 2:02d}, 2024", "₹100.00", "100", "₹10.00", "Open")
+
+
+def check(rows, queries):
+    index = ListingSearchIndex(rows)
+    for query in queries:
+        assert index.search(query).tolist() == brute_force(rows, query), query
+
+
+def test_one_character_words_keep_longer_matches():
+    # 'X' and '0' are whole words; the 1-character prefixes must still match 'X1', '01', ...
+    rows = [listing(f"X {i}", i % 28 + 1) for i in range(300)]
+    check(rows, ['1', 'x', 'x 1', '0', '01', 'nov 1', 'nov 0', '2024 x 2', '12'])
+
+
+def test_random_queries_match_brute_force():
+    rng = random.Random(7)
+    names = ['Alpha', 'Beta', 'A', 'B', 'Ab', 'Solar', 'Steel', 'S', 'Sm', 'Tech', 'T']
+    rows = [listing(' '.join(rng.sample(names, 2)), rng.randint(1, 28)) for _ in range(200)]
+    vocabulary = sorted({word for row in rows for word in tokenize(' '.join(row))})
+    queries = [word[:rng.randint(1, len(word))] for word in vocabulary for _ in range(2)]
+    queries += [f"{a} {b}" for a, b in zip(queries, reversed(queries))]
+    check(rows, queries)
+
+
+def test_narrowing_queries_reuse_the_previous_result():
+    rows = [listing(f"X {i}", i % 28 + 1) for i in range(300)]
+    index = ListingSearchIndex(rows)
+    for query in ['n', 'no', 'nov', 'nov 1', 'nov 12', 'nov 1', 'x', 'x 2', 'x 29']:
+        assert index.search(query).tolist() == brute_force(rows, query), query
@@ -0,0 +1,107 @@
+"""Non-interactive proofs: the wire format, its validation, and context binding"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nizk
+from zkp_protocol import ZKPProtocol
+
+
+@pytest.fixture(scope='module')
+def zkp():
+    return ZKPProtocol()
+
+
+@pytest.fixture(scope='module')
+def proof(zkp):
+    return zkp.generate_noninteractive_proof('ABCDE1234F', b'ctx')
+
+
+def width(zkp):
+    return (zkp.p.bit_length() + 7) // 8
+
+
+def with_values(zkp, proof, commitment=None, response=None):
+    """Encoded proof with raw values written in, bypassing encode_proof's reduction"""
+    data = bytearray(nizk.encode_proof(proof, zkp.p))
+    w = width(zkp)
+    if commitment is not None:
+        data[2:2 + w] = commitment.to_bytes(w, 'big')
+    if response is not None:
+        data[-w:] = response.to_bytes(w, 'big')
+    return bytes(data)
+
+
+def test_round_trip(zkp, proof):
+    data = nizk.encode_proof(proof, zkp.p)
+    assert len(data) == nizk.proof_size(zkp.p)
+    assert nizk.decode_proof(data, zkp.p) == proof
+    assert nizk.decode_proof(nizk.encode_proof(proof, zkp.p, noninteractive=False), zkp.p,
+                             noninteractive=False) == proof
+
+
+def test_round_trip_many(zkp):
+    proofs = [zkp.generate_noninteractive_proof(f'PAN{i}') for i in range(5)]
+    buffer = nizk.encode_proofs(proofs, zkp.p)
+    assert list(nizk.iter_proofs(buffer, zkp.p)) == proofs
+    # Decoding at an offset reads from the buffer in place
+    assert nizk.decode_proof(memoryview(buffer), zkp.p, offset=3 * nizk.proof_size(zkp.p)) == proofs[3]
+
+
+def test_rejects_unknown_version(zkp, proof):
+    data = bytearray(nizk.encode_proof(proof, zkp.p))
+    data[0] = nizk.WIRE_VERSION + 1
+    with pytest.raises(ValueError, match='version'):
+        nizk.decode_proof(bytes(data), zkp.p)
+
+
+def test_rejects_unknown_flags(zkp, proof):
+    data = bytearray(nizk.encode_proof(proof, zkp.p))
+    data[1] |= 0x80
+    with pytest.raises(ValueError, match='flags'):
+        nizk.decode_proof(bytes(data), zkp.p)
+
+
+def test_rejects_kind_mismatch(zkp, proof):
+    with pytest.raises(ValueError):
+        nizk.decode_proof(nizk.encode_proof(proof, zkp.p, noninteractive=False), zkp.p)
+    with pytest.raises(ValueError):
+        nizk.decode_proof(nizk.encode_proof(proof, zkp.p), zkp.p, noninteractive=False)
+
+
+def test_rejects_non_canonical_values(zkp, proof):
+    with pytest.raises(ValueError, match='Non-canonical'):
+        nizk.decode_proof(with_values(zkp, proof, commitment=zkp.p), zkp.p)
+    with pytest.raises(ValueError, match='Non-canonical'):
+        nizk.decode_proof(with_values(zkp, proof, response=zkp.p - 1), zkp.p)
+    # The largest canonical values still decode
+    decoded = nizk.decode_proof(with_values(zkp, proof, commitment=zkp.p - 1, response=zkp.p - 2), zkp.p)
+    assert (decoded['commitment'], decoded['response']) == (zkp.p - 1, zkp.p - 2)
+
+
+def test_rejects_bad_buffer_lengths(zkp, proof):
+    data = nizk.encode_proof(proof, zkp.p)
+    with pytest.raises(ValueError, match='too short'):
+        nizk.decode_proof(data[:-1], zkp.p)
+    with pytest.raises(ValueError, match='too short'):
+        nizk.decode_proof(data, zkp.p, offset=1)
+    with pytest.raises(ValueError, match='multiple'):
+        list(nizk.iter_proofs(data + data[:10], zkp.p))
+
+
+def test_context_is_bound(zkp, proof):
+    assert zkp.verify_noninteractive_proof('ABCDE1234F', proof, b'ctx')
+    assert not zkp.verify_noninteractive_proof('ABCDE1234F', proof, b'other')
+    assert not zkp.verify_noninteractive_proof('ABCDE1234F', proof)
+    assert not zkp.verify_noninteractive_proof('ABCDE1234G', proof, b'ctx')
+
+
+def test_batch_matches_single(zkp):
+    items = [(f'PAN{i}', zkp.generate_noninteractive_proof(f'PAN{i}', b'ctx')) for i in range(6)]
+    items[2] = ('PAN2', zkp.generate_noninteractive_proof('PAN2', b'other'))
+    items[4] = ('WRONG', items[4][1])
+    expected = [zkp.verify_noninteractive_proof(d, p, b'ctx') for d, p in items]
+    assert zkp.verify_noninteractive_batch(items, b'ctx') == expected == [True, True, False, True, False, True]
@@ -0,0 +1,60 @@
+"""VerificationService: results, errors and cancellation, with worker metrics sent back to the parent"""
+import os
+import sys
+from concurrent.futures import wait
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+import nizk
+from verification_service import VerificationService
+from zkp_protocol import ZKPProtocol
+
+
+@pytest.fixture(params=[False, True], ids=['plain', 'measured'])
+def service(request):
+    metrics.reset()
+    if request.param:
+        metrics.enable()
+    try:
+        with VerificationService(ZKPProtocol, workers=1, max_pending=8) as service:
+            yield service
+    finally:
+        metrics.disable()
+        metrics.reset()
+
+
+def test_results_errors_and_cancellation(service):
+    zkp = ZKPProtocol()
+    proof = nizk.encode_proof(zkp.generate_noninteractive_proof('ABCDE1234F', b'ctx'), zkp.p)
+    assert service.submit_identity_check([('ABCDE1234F', proof)], b'ctx').result() is True
+    assert service.submit_identity_check([('ABCDE1234F', proof)], b'other').result() is False
+
+    items = [(f'PAN{i}', zkp.generate_proof(f'PAN{i}')) for i in range(12)]
+    items[7] = ('WRONG', items[7][1])
+    assert service.verify_many(items, chunk_size=4) == [i != 7 for i in range(12)]
+
+    with pytest.raises(TypeError):
+        service.submit_verify('ABCDE1234F', None).result()
+
+    # The pool hands a job or two to the worker's call queue early; only later ones stay cancellable
+    busy = [service.submit_create(['x'] * 300)] + [service.submit_create(['y']) for _ in range(3)]
+    queued = service.submit_create(['z'])
+    assert queued.cancel() and queued.cancelled()
+    done, not_done = wait(busy + [queued], timeout=60)
+    assert not not_done and len(busy[0].result()) == 300
+
+
+def test_worker_metrics_reach_the_parent(service):
+    zkp = ZKPProtocol()
+    items = [(f'PAN{i}', zkp.generate_proof(f'PAN{i}')) for i in range(8)]
+    metrics.reset()
+    service.verify_many(items, chunk_size=4)
+    recorded = {(h['name'], h['labels'].get('op')): h['count'] for h in metrics.to_json()['histograms']}
+    if metrics.enabled():
+        assert recorded[('zkp_operation_seconds', 'verify_batch')] == 2
+        assert ('modexp_seconds', None) in recorded
+    else:
+        assert recorded == {}
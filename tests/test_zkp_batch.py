@@ -0,0 +1,133 @@
+"""Batch verification must give exactly the single-proof results, item by item"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastexp import PIPPENGER_THRESHOLD, get_fixed_base, is_safe_prime
+from zkp_protocol import ZKPProtocol
+
+# RFC 3526 group 14: the 2048-bit MODP group
+RFC3526_GROUP14 = int(
+    'FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74'
+    '020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437'
+    '4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED'
+    'EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05'
+    '98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB'
+    '9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B'
+    'E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718'
+    '3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF', 16)
+
+
+@pytest.fixture(scope='module')
+def zkp():
+    return ZKPProtocol()
+
+
+def single(zkp, items):
+    return [zkp.verify_proof(data, proof) for data, proof in items]
+
+
+def outcome(verify, items):
+    try:
+        return verify(items)
+    except Exception as error:
+        return type(error)
+
+
+def valid(zkp, n, prefix='PAN'):
+    return [(f'{prefix}{i:05d}', zkp.generate_proof(f'{prefix}{i:05d}')) for i in range(n)]
+
+
+def test_all_valid(zkp):
+    items = valid(zkp, 8)
+    assert zkp.verify_batch(items) == single(zkp, items) == [True] * 8
+
+
+def test_tampered_response_and_wrong_identity(zkp):
+    items = valid(zkp, 8)
+    data, proof = items[2]
+    items[2] = (data, dict(proof, response=(proof['response'] + 1) % (zkp.p - 1)))
+    items[5] = ('SOMEONE-ELSE', items[5][1])
+    assert zkp.verify_batch(items) == single(zkp, items)
+    assert zkp.verify_batch(items).count(False) == 2
+
+
+def test_negated_commitment(zkp):
+    # -R passes a random-weight check whenever the weight is even; it must never pass here
+    items = valid(zkp, 6)
+    data, proof = items[3]
+    items[3] = (data, dict(proof, commitment=zkp.p - proof['commitment']))
+    for _ in range(8):
+        assert zkp.verify_batch(items) == single(zkp, items) == [True, True, True, False, True, True]
+
+
+def test_malformed_proofs_take_the_single_path(zkp):
+    items = valid(zkp, 4)
+    data, proof = items[0]
+    malformed = [
+        ('PAN00000', dict(proof, commitment=0)),
+        ('PAN00000', {'commitment': proof['commitment'], 'challenge': proof['challenge']}),
+        ('PAN00000', dict(proof, response=str(proof['response']))),
+        ('PAN00000', dict(proof, response=True)),
+        ('PAN00000', None),
+    ]
+    # Whatever verify_proof does with these, False or an error, the batch must do the same
+    for bad in malformed:
+        assert outcome(zkp.verify_batch, items + [bad]) == outcome(lambda i: single(zkp, i), items + [bad])
+
+
+def test_large_batch_bisects_to_the_bad_proofs(zkp):
+    items = valid(zkp, PIPPENGER_THRESHOLD * 2 + 3)
+    for i in (0, 17, PIPPENGER_THRESHOLD, len(items) - 1):
+        data, proof = items[i]
+        items[i] = (data, dict(proof, challenge=proof['challenge'] + 1))
+    results = zkp.verify_batch(items)
+    assert results == single(zkp, items)
+    assert results.count(False) == 4
+
+
+def test_not_safe_prime_falls_back_to_single_proofs():
+    class MersenneGroup(ZKPProtocol):
+        def __init__(self):
+            super().__init__()
+            # Prime, but (p - 1) / 2 is not, so the batched equation is not sound
+            self.p = 2 ** 127 - 1
+            self.g_table = get_fixed_base(self.g, self.p)
+            self.single_calls = 0
+
+        def verify_proof(self, public_data, proof):
+            self.single_calls += 1
+            return super().verify_proof(public_data, proof)
+
+    zkp = MersenneGroup()
+    assert not is_safe_prime(zkp.p)
+    items = valid(zkp, 5)
+    items[1] = ('WRONG', items[1][1])
+    zkp.single_calls = 0
+    assert zkp.verify_batch(items) == [True, False, True, True, True]
+    assert zkp.single_calls == 5
+
+
+def test_modulus_is_rfc3526_group14(zkp):
+    from ZKP_GUI import ZKPVerification
+    assert ZKPVerification().p == zkp.p == RFC3526_GROUP14
+    assert is_safe_prime(RFC3526_GROUP14)
+
+
+def test_gui_verifier_batch_matches_single():
+    from ZKP_GUI import ZKPVerification
+    zkp = ZKPVerification()
+    items = [(f'PAN{i}', zkp.create_proof(f'PAN{i}')) for i in range(6)]
+    items[4] = ('OTHER', items[4][1])
+    assert zkp.verify_batch(items) == [zkp.verify_proof(d, p) for d, p in items]
+
+
+def test_public_key_is_the_same_from_the_cache():
+    zkp = ZKPProtocol()
+    first = zkp.public_key('ABCDE1234F')
+    assert first == (zkp.hash_to_int('ABCDE1234F'), pow(zkp.g, zkp.hash_to_int('ABCDE1234F'), zkp.p))
+    assert zkp.public_key('ABCDE1234F') == first
+    assert zkp.identity_cache.stats()['hits'] == 1 and len(zkp.identity_cache) == 1
@@ -0,0 +1,203 @@
+import os
+import shutil
+import signal
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import metrics
+import nizk
+from fastexp import TABLE_CACHE_ENV, get_fixed_base
+
+
+class ServiceBusy(Exception):
+    """Raised when the submission queue stays full for longer than the caller is willing to wait"""
+
+
+# Per-worker ZKP instance, built once by _init_worker
+_worker_zkp = None
+
+
+def _init_worker(zkp_class: type, cache_dir: str, measure: bool = False) -> None:
+    """Build the group parameters and fixed-base table once per worker process"""
+    global _worker_zkp
+    # Ctrl+C reaches the whole process group; only the parent should react and shut the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.environ[TABLE_CACHE_ENV] = cache_dir
+    if measure:
+        metrics.enable()
+    _worker_zkp = zkp_class()
+
+
+def _measured(fn: Callable, *args: Any) -> Tuple[Any, list]:
+    """Run a job and return what it recorded with its result, for the parent to merge"""
+    result = fn(*args)
+    return result, metrics.drain()
+
+
+class _MeasuredFuture(Future):
+    """The result of a _measured job, once its metrics are merged into the parent's"""
+
+    def __init__(self, job: Future):
+        super().__init__()
+        self._job = job
+        job.add_done_callback(self._finish)
+
+    def cancel(self) -> bool:
+        # Succeeds only while the job is queued; _finish then cancels this future as well
+        return self._job.cancel()
+
+    def _finish(self, job: Future) -> None:
+        if job.cancelled():
+            super().cancel()
+            # Wakes wait() and as_completed() callers, as the executor does for its own futures
+            self.set_running_or_notify_cancel()
+            return
+        error = job.exception()
+        if error is not None:
+            self.set_exception(error)
+            return
+        result, drained = job.result()
+        metrics.merge(drained)
+        self.set_result(result)
+
+
+def _create_proofs(secrets: Sequence[str]) -> List[Dict[str, int]]:
+    return [_worker_zkp.generate_proof(secret) for secret in secrets]
+
+
+def _verify_proof(public_data: str, proof: Dict[str, int]) -> bool:
+    return _worker_zkp.verify_proof(public_data, proof)
+
+
+def _verify_batch(items: Sequence[Tuple[str, Dict[str, int]]]) -> List[bool]:
+    return _worker_zkp.verify_batch(items)
+
+
+def _check_identity(claims: Sequence[Tuple[str, Optional[bytes]]], context: bytes) -> bool:
+    """Verify every (identifier, encoded proof) claim; without a proof, prove and verify in place"""
+    for data, encoded in claims:
+        if encoded is None:
+            ok = _worker_zkp.verify_proof(data, _worker_zkp.generate_proof(data))
+        else:
+            try:
+                proof = nizk.decode_proof(encoded, _worker_zkp.p)
+            except ValueError:
+                return False
+            ok = nizk.verify_proof(_worker_zkp, data, proof, context)
+        if not ok:
+            return False
+    return True
+
+
+def _check_identity_batch(claims: Sequence[Tuple[str, bytes]], context: bytes) -> List[bool]:
+    """Verify many (identifier, encoded non-interactive proof) claims with one batched equation"""
+    results = [False] * len(claims)
+    items, positions = [], []
+    for i, (data, encoded) in enumerate(claims):
+        try:
+            items.append((data, nizk.decode_proof(encoded, _worker_zkp.p)))
+        except ValueError:
+            continue
+        positions.append(i)
+    for i, ok in zip(positions, nizk.verify_batch(_worker_zkp, items, context)):
+        results[i] = ok
+    return results
+
+
+class VerificationService:
+    """Runs proof creation and verification on a process pool with a bounded submission queue
+
+    At most max_pending jobs are queued or running at once. Submitting beyond that blocks
+    (backpressure) until a slot frees up, or raises ServiceBusy once `timeout` expires.
+    """
+
+    def __init__(self, zkp_class: type, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None, cache_dir: Optional[str] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        # Build the table once here and write it to disk; workers load it instead of recomputing
+        self._owns_cache = cache_dir is None
+        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix='zkp_tables_')
+        zkp = zkp_class()
+        get_fixed_base(zkp.g, zkp.p, cache_dir=self.cache_dir)
+
+        # Workers record metrics too when the parent does, and send them back with each result
+        self._measure = metrics.enabled()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(zkp_class, self.cache_dir, self._measure),
+        )
+
+    def _submit(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Future:
+        """Wait for a free slot, then hand the job to the pool"""
+        if not self._slots.acquire(timeout=timeout):
+            raise ServiceBusy(f"{self.max_pending} jobs already pending")
+        try:
+            future = self._executor.submit(_measured, fn, *args) if self._measure else self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Runs on completion, failure and cancellation alike, and before the caller's callbacks
+        future.add_done_callback(lambda _: self._slots.release())
+        return _MeasuredFuture(future) if self._measure else future
+
+    def submit_create(self, secrets: Sequence[str], timeout: Optional[float] = None) -> Future:
+        """Create one proof per secret in a worker; the future resolves to a list of proofs"""
+        return self._submit(_create_proofs, list(secrets), timeout=timeout)
+
+    def submit_verify(self, public_data: str, proof: Dict[str, int],
+                      timeout: Optional[float] = None) -> Future:
+        """Verify a single proof in a worker; the future resolves to a bool"""
+        return self._submit(_verify_proof, public_data, proof, timeout=timeout)
+
+    def submit_verify_batch(self, items: Sequence[Tuple[str, Dict[str, int]]],
+                            timeout: Optional[float] = None) -> Future:
+        """Verify a chunk of proofs with verify_batch in a worker; resolves to a list of bools"""
+        return self._submit(_verify_batch, list(items), timeout=timeout)
+
+    def submit_identity_check(self, claims: Sequence[Tuple[str, Optional[bytes]]], context: bytes = b'',
+                              timeout: Optional[float] = None) -> Future:
+        """Check (identifier, encoded non-interactive proof or None) claims; resolves to one bool"""
+        return self._submit(_check_identity, list(claims), context, timeout=timeout)
+
+    def submit_identity_batch(self, claims: Sequence[Tuple[str, bytes]], context: bytes = b'',
+                              timeout: Optional[float] = None) -> Future:
+        """Check many (identifier, encoded non-interactive proof) claims; resolves to a list of bools"""
+        return self._submit(_check_identity_batch, list(claims), context, timeout=timeout)
+
+    def verify_many(self, items: Sequence[Tuple[str, Dict[str, int]]], chunk_size: int = 256,
+                    timeout: Optional[float] = None) -> List[bool]:
+        """Verify items in parallel chunks; on timeout, cancel what has not started and re-raise"""
+        futures = []
+        try:
+            for start in range(0, len(items), chunk_size):
+                futures.append(self.submit_verify_batch(items[start:start + chunk_size], timeout=timeout))
+            done, not_done = wait(futures, timeout=timeout)
+            if not_done:
+                raise TimeoutError(f"{len(not_done)} of {len(futures)} chunks still pending")
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        results: List[bool] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    def shutdown(self, cancel_pending: bool = True) -> None:
+        """Stop the workers, dropping queued jobs unless cancel_pending is False"""
+        self._executor.shutdown(wait=True, cancel_futures=cancel_pending)
+        if self._owns_cache:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def __enter__(self) -> 'VerificationService':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
@@ -0,0 +1,206 @@
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence
+
+from tkinter import ttk
+
+import metrics
+
+
+class ListSource:
+    """Data source over an in-memory sequence of row tuples"""
+
+    def __init__(self, rows: Sequence[tuple]):
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self, start: int, stop: int) -> Sequence[tuple]:
+        return self._rows[start:stop]
+
+
+class SubsetSource:
+    """Data source showing only the given row numbers of another sequence, e.g. search results"""
+
+    def __init__(self, rows: Sequence[tuple], indices: Sequence[int]):
+        self._rows = rows
+        self._indices = indices
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def rows(self, start: int, stop: int) -> List[tuple]:
+        rows = self._rows
+        return [rows[i] for i in self._indices[start:stop]]
+
+
+class PagedSource:
+    """Data source that fetches fixed-size pages on demand and keeps the most recent ones"""
+
+    def __init__(self, total: int, fetch_page: Callable[[int, int], Sequence[tuple]],
+                 page_size: int = 200, max_pages: int = 8):
+        self.total = total
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._pages: 'OrderedDict[int, Sequence[tuple]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _page(self, number: int) -> Sequence[tuple]:
+        page = self._pages.get(number)
+        if page is None:
+            page = self.fetch_page(number * self.page_size, self.page_size)
+            self._pages[number] = page
+            if len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page
+
+    def rows(self, start: int, stop: int) -> List[tuple]:
+        result: List[tuple] = []
+        stop = min(stop, self.total)
+        while start < stop:
+            number, offset = divmod(start, self.page_size)
+            page = self._page(number)
+            chunk = page[offset:offset + stop - start]
+            if not chunk:
+                break
+            result.extend(chunk)
+            start += len(chunk)
+        return result
+
+
+class VirtualTreeview:
+    """Shows a window of a large listing in a ttk.Treeview that only ever holds a screenful of items
+
+    The Treeview's items are reused as the window moves: scrolling rewrites their values from
+    the data source instead of inserting or deleting rows, so widget count stays constant.
+    Selection handlers go through `on_select` rather than binding <<TreeviewSelect>> directly,
+    so that the selection changes made while scrolling are not reported as user clicks.
+    """
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, source=None,
+                 on_select: Optional[Callable] = None, buffer_rows: int = 2):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.source = source if source is not None else ListSource([])
+        self.on_select = on_select
+        self.buffer_rows = buffer_rows
+        self.offset = 0
+        self.visible_rows = max(1, int(tree.cget('height')))
+        self.selected_index: Optional[int] = None
+        self._items: List[str] = []
+        # <<TreeviewSelect>> is queued, so count our own selection changes and swallow their events
+        self._pending_events = 0
+
+        tree.configure(yscrollcommand='')
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<Configure>', self._on_resize, add='+')
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<MouseWheel>', lambda e: self._scroll_by(-1 if e.delta > 0 else 1, 'units'))
+        tree.bind('<Button-4>', lambda e: self._scroll_by(-1, 'units'))
+        tree.bind('<Button-5>', lambda e: self._scroll_by(1, 'units'))
+        tree.bind('<Up>', lambda e: self._move_selection(-1))
+        tree.bind('<Down>', lambda e: self._move_selection(1))
+        tree.bind('<Prior>', lambda e: self._scroll_by(-1, 'pages'))
+        tree.bind('<Next>', lambda e: self._scroll_by(1, 'pages'))
+        tree.bind('<Home>', lambda e: self.scroll_to(0) or 'break')
+        tree.bind('<End>', lambda e: self.scroll_to(len(self.source)) or 'break')
+
+    def set_source(self, source) -> None:
+        """Show a different listing, starting from the top"""
+        self.source = source
+        self.offset = 0
+        self.selected_index = None
+        self.refresh()
+
+    def index_of(self, item: str) -> Optional[int]:
+        """Position in the data source of the row a Treeview item currently shows"""
+        try:
+            return self.offset + self._items.index(item)
+        except ValueError:
+            return None
+
+    def scroll_to(self, offset: int) -> None:
+        last = max(0, len(self.source) - self.visible_rows)
+        offset = max(0, min(int(offset), last))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    @metrics.timed('widget_update_seconds', widget='tree')
+    def refresh(self) -> None:
+        """Rewrite the Treeview items from the source for the current window"""
+        total = len(self.source)
+        wanted = min(self.visible_rows + self.buffer_rows, max(0, total - self.offset))
+        while len(self._items) < wanted:
+            self._items.append(self.tree.insert('', 'end'))
+        while len(self._items) > wanted:
+            self.tree.delete(self._items.pop())
+
+        rows = self.source.rows(self.offset, self.offset + wanted)
+        for item, values in zip(self._items, rows):
+            self.tree.item(item, values=values)
+
+        # Keep the highlight on the same data row, not on the same widget item
+        selected = []
+        if self.selected_index is not None:
+            position = self.selected_index - self.offset
+            if 0 <= position < len(self._items):
+                selected = [self._items[position]]
+        if tuple(selected) != self.tree.selection():
+            self._pending_events += 1
+            self.tree.selection_set(selected)
+
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_select(self, event) -> None:
+        if self._pending_events:
+            self._pending_events -= 1
+            return
+        selection = self.tree.selection()
+        self.selected_index = self.index_of(selection[0]) if selection else None
+        if self.on_select is not None:
+            self.on_select(event)
+
+    def _on_resize(self, event) -> None:
+        style = ttk.Style(self.tree)
+        row_height = int(style.lookup('Treeview', 'rowheight') or 20)
+        # Leave room for the heading row
+        visible = max(1, event.height // row_height - 1)
+        if visible != self.visible_rows:
+            self.visible_rows = visible
+            self.refresh()
+
+    def _on_scrollbar(self, action: str, amount: str, unit: Optional[str] = None) -> None:
+        if action == 'moveto':
+            self.scroll_to(float(amount) * len(self.source))
+        elif action == 'scroll':
+            self._scroll_by(int(amount), unit)
+
+    def _scroll_by(self, amount: int, unit: Optional[str]) -> str:
+        step = self.visible_rows if unit == 'pages' else 1
+        self.scroll_to(self.offset + amount * step)
+        return 'break'
+
+    def _move_selection(self, delta: int) -> str:
+        """Arrow keys move through the whole listing, scrolling the window at its edges"""
+        total = len(self.source)
+        if not total:
+            return 'break'
+        current = self.selected_index if self.selected_index is not None else self.offset - delta
+        target = max(0, min(total - 1, current + delta))
+        if target < self.offset:
+            self.scroll_to(target)
+        elif target >= self.offset + self.visible_rows:
+            self.scroll_to(target - self.visible_rows + 1)
+        item = self._items[target - self.offset]
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+        return 'break'
@@ -1,87 +1,87 @@
+import time
+# Read before anything else is imported, so the first-paint report covers the imports
+STARTED = time.perf_counter()
+
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
-import hashlib
-import random
-from typing import Dict, Any
 import json
+import metrics
+from zkp_protocol import ZKPProtocol
+from applicant_index import ApplicantIndex, load_or_build_index
+from gui_tasks import WARMUP_DELAY_MS, TaskScheduler, after_first_paint, report_first_paint
+# ingest (and with it pandas) is imported when the applications are loaded, after the window is up
 
-class ZKPProtocol:
-    def __init__(self):
-        # Large prime number and generator for the multiplicative group
-        self.p = int('FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74'
-                    '020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437'
-                    '4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED'
-                    'EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05'
-                    '98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB'
-                    '9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B'
-                    'E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718'
-                    '3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF', 16)
-        self.g = 2
-        
-    def hash_to_int(self, data: str) -> int:
-        """Convert string data to integer using SHA-256"""
-        return int.from_bytes(hashlib.sha256(data.encode()).digest(), 'big')
-    
-    def generate_proof(self, secret_data: str) -> Dict[str, Any]:
-        """Generate ZKP proof for given secret data"""
-        # Convert secret to number
-        x = self.hash_to_int(secret_data)
-        
-        # Generate random value for commitment
-        r = random.randrange(self.p)
-        
-        # Calculate commitment
-        commitment = pow(self.g, r, self.p)
-        
-        # Generate challenge (in real system, this would come from verifier)
-        challenge = random.randrange(2**128)
-        
-        # Calculate response
-        response = (r + challenge * x) % (self.p - 1)
-        
-        return {
-            'commitment': commitment,
-            'challenge': challenge,
-            'response': response
-        }
-    
-    def verify_proof(self, public_data: str, proof: Dict[str, Any]) -> bool:
-        """Verify ZKP proof against public data"""
-        x = self.hash_to_int(public_data)
-        
-        # Verify: g^response = commitment * (g^x)^challenge
-        left_side = pow(self.g, proof['response'], self.p)
-        right_side = (proof['commitment'] * 
-                     pow(pow(self.g, x, self.p), 
-                         proof['challenge'], self.p)) % self.p
-        
-        return left_side == right_side
+# Application fields shown after a successful verification
+DISPLAY_COLUMNS = ('name', 'investment_experience_years', 'risk_category', 'kyc_verified', 'residential_status')
 
 class IPOApplication(tk.Tk):
-    def __init__(self):
+    def __init__(self, lazy=True):
         super().__init__()
         
         self.title("Secure IPO Application System")
         self.geometry("800x600")
         
-        # Initialize ZKP Protocol
-        self.zkp = ZKPProtocol()
+        # ZKP Protocol, created with the database: building its fixed-base table takes ~0.5 s
+        self.zkp = None
+        self.db = None
+        self.index = ApplicantIndex()
+        self.database_ready = False
+        self.database_task = None
         
-        # Load sample database
-        self.load_database()
+        # Loading runs on a worker thread, so the window can paint first
+        self.tasks = TaskScheduler(self)
+        self.protocol("WM_DELETE_WINDOW", self.close)
         
         # Create GUI elements
         self.create_widgets()
         
+        if lazy:
+            # Load once the window has painted, or on the first lookup if that comes sooner
+            after_first_paint(self, lambda: self.after(WARMUP_DELAY_MS, self.warm_up))
+        else:
+            try:
+                self.database_loaded(self.load_database())
+            except FileNotFoundError as e:
+                self.database_failed(e)
+        
+    def warm_up(self):
+        """Start loading the database in the background, unless that has already started"""
+        if self.database_task is None:
+            self.database_task = self.tasks.submit(self.load_database, key='database',
+                                                   on_done=self.database_loaded, on_error=self.database_failed)
+        
     def load_database(self):
-        """Load the sample database of users"""
-        try:
-            self.db = pd.read_csv('ipo_applications.csv')
-        except FileNotFoundError:
+        """Load the sample database of users and the ZKP protocol; returns (db, index)"""
+        from ingest import load_applications
+        if self.zkp is None:
+            self.zkp = ZKPProtocol()
+        # Typed load through the columnar cache, of only what display_verified_user shows
+        with metrics.timer('load_seconds', stage='applications'):
+            db = load_applications('ipo_applications.csv', columns=DISPLAY_COLUMNS)
+        # PAN -> row offset, so lookups don't scan the whole column
+        with metrics.timer('load_seconds', stage='index'):
+            index = load_or_build_index(db, 'ipo_applications.csv')
+        return db, index
+        
+    def database_loaded(self, loaded):
+        self.db, self.index = loaded
+        self.database_ready = True
+        self.result_text.delete(1.0, tk.END)
+        
+    def database_failed(self, error):
+        # Lookups then find no one rather than waiting forever
+        self.database_ready = True
+        self.result_text.delete(1.0, tk.END)
+        if isinstance(error, FileNotFoundError):
             messagebox.showerror("Error", "Database file not found!")
-            self.db = pd.DataFrame()
-            
+        else:
+            messagebox.showerror("Error", f"Could not load the database: {error}")
+        
+    def close(self):
+        self.tasks.shutdown()
+        self.destroy()
+        
     def create_widgets(self):
         """Create GUI elements"""
         # Main container
@@ -114,10 +114,20 @@ class IPOApplication(tk.Tk):
         pan = self.pan_entry.get()
         aadhar = self.aadhar_entry.get()
         
+        if not self.database_ready:
+            # Looked up before the warm-up finished, or started: verify once the data is in
+            self.warm_up()
+            self.database_task.add_callbacks(on_done=lambda loaded: self.verify_identity())
+            self.result_text.delete(1.0, tk.END)
+            self.result_text.insert(tk.END, "Loading applications...")
+            return
+        
         # Find user in database
-        user = self.db[self.db['pan_number'] == pan]
+        with metrics.timer('lookup_seconds', key='pan'):
+            row = self.index.lookup_pan(pan)
+        metrics.count('lookups', result='miss' if row is None else 'hit')
         
-        if len(user) == 0:
+        if row is None:
             messagebox.showerror("Error", "User not found!")
             return
             
@@ -131,7 +141,8 @@ class IPOApplication(tk.Tk):
         
         if pan_verified and aadhar_verified:
             # Show user details without revealing sensitive information
-            self.display_verified_user(user.iloc[0])
+            with metrics.timer('widget_update_seconds', widget='verified_user'):
+                self.display_verified_user(self.db.iloc[row])
         else:
             messagebox.showerror("Error", "Verification failed!")
             
@@ -154,7 +165,14 @@ Application Status: Active
         self.result_text.insert(tk.END, display_text)
 
 def main():
-    app = IPOApplication()
+    parser = argparse.ArgumentParser(description="Secure IPO application system")
+    parser.add_argument('--eager', action='store_true', help="load the applications before showing the window")
+    parser.add_argument('--exit-after-paint', action='store_true', help="close once the first paint is reported (see benchmarks/startup.py)")
+    args = parser.parse_args()
+    metrics.configure_from_env()
+    app = IPOApplication(lazy=not args.eager)
+    metrics.register_collector(lambda: {f'identity_cache_{k}': v for k, v in app.zkp.identity_cache.stats().items()} if app.zkp else {})
+    report_first_paint(app, STARTED, app.close if args.exit_after_paint else None)
     app.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+import secrets
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from fastexp import is_safe_prime, jacobi, multi_exp
+
+# Random batching weights are this many bits; a bad batch slips through with probability ~2^-63
+WEIGHT_BITS = 64
+
+
+def _well_formed(proof: Any, p: int) -> bool:
+    """True if the proof can be folded into a batch without changing its single-proof result"""
+    if not isinstance(proof, dict):
+        return False
+    values = [proof.get('commitment'), proof.get('challenge'), proof.get('response')]
+    if not all(type(v) is int for v in values):
+        return False
+    commitment = values[0] % p
+    # Valid commitments are powers of g, i.e. quadratic residues; anything else (including
+    # -R for a valid R, which random weights only catch half the time) takes the single path
+    return commitment != 0 and jacobi(commitment, p) == 1
+
+
+def verify_batch(zkp: Any, items: Sequence[Tuple[str, Dict[str, Any]]],
+                 hash_to_int: Callable[[str], int]) -> List[bool]:
+    """Verify many (public_data, proof) pairs at once; results match zkp.verify_proof item by item
+
+    All proofs are combined with random weights w_i into one check
+        g^(sum w_i*(s_i - x_i*c_i)) == prod R_i^w_i  (mod p)
+    and a failing batch is bisected down to single proofs to find the bad ones.
+    """
+    p, g = zkp.p, zkp.g
+    results: List[bool] = [False] * len(items)
+
+    # Batching is only sound in the prime-order subgroup of a safe-prime group
+    if not is_safe_prime(p) or jacobi(g, p) != 1:
+        return [zkp.verify_proof(data, proof) for data, proof in items]
+
+    batchable = []
+    for i, (data, proof) in enumerate(items):
+        if _well_formed(proof, p):
+            batchable.append((i, hash_to_int(data), proof))
+        else:
+            results[i] = zkp.verify_proof(data, proof)
+
+    order = p - 1
+
+    def check(group):
+        exponent = 0
+        bases = []
+        for _, x, proof in group:
+            w = secrets.randbits(WEIGHT_BITS) | 1
+            exponent += w * (proof['response'] - x * proof['challenge'])
+            bases.append((proof['commitment'], w))
+        return zkp.g_table.pow(exponent % order) == multi_exp(bases, p)
+
+    def resolve(group):
+        if len(group) == 1:
+            i, _, proof = group[0]
+            results[i] = zkp.verify_proof(items[i][0], proof)
+        elif check(group):
+            for i, _, _ in group:
+                results[i] = True
+        else:
+            mid = len(group) // 2
+            resolve(group[:mid])
+            resolve(group[mid:])
+
+    if batchable:
+        resolve(batchable)
+    return results
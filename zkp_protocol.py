@@ -0,0 +1,101 @@
+"""Schnorr proof of knowledge of a hashed identity, shared by the GUI, the status server and
+the bulk tools; imports nothing GUI-related, so headless processes can use it"""
+import hashlib
+import random
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastexp import get_fixed_base
+from identity_cache import IdentityCache, identity_digest
+from zkp_batch import verify_batch
+import nizk
+import metrics
+
+
+class ZKPProtocol:
+    def __init__(self):
+        # Large prime number and generator for the multiplicative group
+        self.p = int('FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74'
+                    '020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437'
+                    '4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED'
+                    'EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05'
+                    '98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB'
+                    '9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B'
+                    'E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718'
+                    '3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF', 16)
+        self.g = 2
+        # Precomputed powers of g, shared by every instance in the process
+        self.g_table = get_fixed_base(self.g, self.p)
+        # g^x per identity, keyed by its SHA-256 (which is x) so raw PAN/Aadhar values are not retained
+        self.identity_cache = IdentityCache()
+        
+    @metrics.timed('zkp_operation_seconds', "Time in ZKP protocol operations", op='hash')
+    def hash_to_int(self, data: str) -> int:
+        """Convert string data to integer using SHA-256"""
+        return int.from_bytes(hashlib.sha256(data.encode()).digest(), 'big')
+
+    def public_key(self, data: str) -> Tuple[int, int]:
+        """Return (x, g^x mod p) for the identity, computing g^x only on a cache miss"""
+        digest = identity_digest(data)
+        x = int.from_bytes(digest, 'big')
+        y = self.identity_cache.get(digest)
+        if y is None:
+            y = self.g_table.pow(x)
+            self.identity_cache.put(digest, y)
+        return x, y
+    
+    @metrics.timed('zkp_operation_seconds', op='prove')
+    def generate_proof(self, secret_data: str) -> Dict[str, Any]:
+        """Generate ZKP proof for given secret data"""
+        # Convert secret to number
+        x = self.hash_to_int(secret_data)
+        
+        # Generate random value for commitment
+        r = random.randrange(self.p)
+        
+        # Calculate commitment
+        commitment = self.g_table.pow(r)
+        
+        # Generate challenge (in real system, this would come from verifier)
+        challenge = random.randrange(2**128)
+        
+        # Calculate response
+        response = (r + challenge * x) % (self.p - 1)
+        
+        return {
+            'commitment': commitment,
+            'challenge': challenge,
+            'response': response
+        }
+    
+    @metrics.timed('zkp_operation_seconds', op='verify')
+    def verify_proof(self, public_data: str, proof: Dict[str, Any]) -> bool:
+        """Verify ZKP proof against public data"""
+        x = self.hash_to_int(public_data)
+        
+        # Verify: g^response = commitment * (g^x)^challenge = commitment * g^(x * challenge)
+        left_side = self.g_table.pow(proof['response'])
+        right_side = (proof['commitment'] *
+                     self.g_table.pow(x * proof['challenge'])) % self.p
+        
+        return left_side == right_side
+
+    @metrics.timed('zkp_operation_seconds', op='verify_batch')
+    def verify_batch(self, items: Sequence[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """Verify many (public_data, proof) pairs with one combined check"""
+        return verify_batch(self, items, self.hash_to_int)
+
+    @metrics.timed('zkp_operation_seconds', op='nizk_prove')
+    def generate_noninteractive_proof(self, secret_data: str, context: bytes = b'') -> Dict[str, Any]:
+        """Generate a proof whose challenge is derived by hashing (g, y, commitment, context)"""
+        return nizk.create_proof(self, secret_data, context)
+
+    @metrics.timed('zkp_operation_seconds', op='nizk_verify')
+    def verify_noninteractive_proof(self, public_data: str, proof: Dict[str, Any], context: bytes = b'') -> bool:
+        """Verify a non-interactive proof, including that its challenge is the hashed one"""
+        return nizk.verify_proof(self, public_data, proof, context)
+
+    @metrics.timed('zkp_operation_seconds', op='nizk_verify_batch')
+    def verify_noninteractive_batch(self, items: Sequence[Tuple[str, Dict[str, Any]]],
+                                    context: bytes = b'') -> List[bool]:
+        """Verify many non-interactive proofs with one combined check"""
+        return nizk.verify_batch(self, items, context)